@@ -0,0 +1,115 @@
+"""Rolling reward statistics over many nodes, for hub-level analysis off the node.
+
+Takes a nodes x days reward matrix, newest day first like hub.calculate_rewards,
+and computes SMA, EMA, volatility, gross income and APY for any set of windows,
+with the same sovereign tax gross-up and deposit as hub.calculate_moving_averages.
+NumPy is used when it is installed. This lives next to the benchmarks rather than
+in the plugin, which only needs the per-network values of its own node.
+"""
+import importlib
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "plugin"))
+
+import hub  # noqa: E402
+
+
+def _load_numpy():
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        return None
+
+
+def rolling_reward_stats(rewards, stake_values, sovereign_taxes, windows=(7, 30),
+                         deposit_multiplier=None, use_numpy=True):
+    """Reward statistics of many nodes for any set of windows in one pass.
+
+    `rewards` is a nodes x days matrix, newest day first like calculate_rewards. Rewards are
+    grossed up by each node's sovereign tax, as calculate_moving_averages does. For every
+    window N the result holds per-node lists under "ma<N>": sma, ema (span N), volatility
+    (standard deviation of daily income), gross (total income) and apy. Windows longer than
+    the available days yield zeros, like calculate_moving_averages.
+
+    Uses NumPy when it is installed, plain Python otherwise.
+    """
+    if deposit_multiplier is None:
+        deposit_multiplier = hub.DEPOSIT_MULTIPLIER
+    np = _load_numpy() if use_numpy else None
+    if np is not None:
+        return _rolling_reward_stats_numpy(np, rewards, stake_values, sovereign_taxes, windows, deposit_multiplier)
+    return _rolling_reward_stats_python(rewards, stake_values, sovereign_taxes, windows, deposit_multiplier)
+
+
+def _rolling_reward_stats_numpy(np, rewards, stake_values, sovereign_taxes, windows, deposit_multiplier):
+    matrix = np.asarray(rewards, dtype=np.float64)
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(stake_values), -1)
+    days = matrix.shape[1]
+    multiplier = 1 / (1 - np.asarray(sovereign_taxes, dtype=np.float64) / 100)
+    income = matrix * multiplier[:, None]
+    deposits = np.asarray(stake_values, dtype=np.float64) * deposit_multiplier
+    # Prefix sums give every window's sum and sum of squares without re-reading the matrix
+    sums = np.cumsum(income, axis=1)
+    squares = np.cumsum(income * income, axis=1)
+    safe_deposits = np.where(deposits > 0, deposits, 1)
+    stats = {}
+    for window in windows:
+        if window > days:
+            zeros = np.zeros(len(deposits)).tolist()
+            stats[f"ma{window}"] = {"sma": zeros, "ema": zeros, "volatility": zeros, "gross": zeros, "apy": zeros}
+            continue
+        gross = sums[:, window - 1]
+        sma = gross / window
+        variance = np.maximum(squares[:, window - 1] / window - sma * sma, 0)
+        alpha = 2 / (window + 1)
+        weights = (1 - alpha) ** np.arange(days)
+        ema = income @ weights / weights.sum()
+        apy = np.where(deposits > 0, sma * 365 / safe_deposits * 100, 0)
+        stats[f"ma{window}"] = {
+            "sma": sma.tolist(),
+            "ema": ema.tolist(),
+            "volatility": np.sqrt(variance).tolist(),
+            "gross": gross.tolist(),
+            "apy": apy.tolist(),
+        }
+    return stats
+
+
+def _rolling_reward_stats_python(rewards, stake_values, sovereign_taxes, windows, deposit_multiplier):
+    stats = {f"ma{window}": {"sma": [], "ema": [], "volatility": [], "gross": [], "apy": []} for window in windows}
+    for row, stake_value, sovereign_tax in zip(rewards, stake_values, sovereign_taxes):
+        multiplier = 1 / (1 - float(sovereign_tax) / 100)
+        income = [value * multiplier for value in row]
+        deposit = float(stake_value) * deposit_multiplier
+        sums = []
+        squares = []
+        total = total_squares = 0.0
+        for value in income:
+            total += value
+            total_squares += value * value
+            sums.append(total)
+            squares.append(total_squares)
+        for window in windows:
+            entry = stats[f"ma{window}"]
+            if window > len(income):
+                for name in entry:
+                    entry[name].append(0.0)
+                continue
+            gross = sums[window - 1]
+            sma = gross / window
+            alpha = 2 / (window + 1)
+            weighted = weight_total = 0.0
+            weight = 1.0
+            for value in income:
+                weighted += weight * value
+                weight_total += weight
+                weight *= 1 - alpha
+            entry["sma"].append(sma)
+            entry["ema"].append(weighted / weight_total)
+            entry["volatility"].append(math.sqrt(max(squares[window - 1] / window - sma * sma, 0)))
+            entry["gross"].append(gross)
+            entry["apy"].append(sma * 365 / deposit * 100 if deposit > 0 else 0)
+    return stats
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Rolling reward statistics for a whole network: NumPy versus pure Python.
+
+    python3 bench/bench_analytics.py [--nodes 10000] [--days 365] [--windows 7 30 90 365]
+
+Both implementations run on the same random nodes x days matrix and must
+agree; timings are printed as JSON. Without NumPy only the pure-Python
+path is measured.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import analytics  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def max_difference(a, b):
+    worst = 0.0
+    for window, stats in a.items():
+        for name, values in stats.items():
+            for x, y in zip(values, b[window][name]):
+                worst = max(worst, abs(x - y) / max(abs(x), abs(y), 1e-12))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--windows", type=int, nargs="+", default=[7, 30, 90, 365])
+    opts = parser.parse_args()
+
+    rng = random.Random(1)
+    rewards = [[rng.uniform(0, 5) for _ in range(opts.days)] for _ in range(opts.nodes)]
+    stakes = [rng.uniform(1, 100) for _ in range(opts.nodes)]
+    taxes = [rng.choice((0, 5, 10, 20)) for _ in range(opts.nodes)]
+    windows = tuple(opts.windows)
+
+    report = {"nodes": opts.nodes, "days": opts.days, "windows": list(windows)}
+    python_s, python_stats = timed(
+        lambda: analytics.rolling_reward_stats(rewards, stakes, taxes, windows, use_numpy=False))
+    report["python_s"] = round(python_s, 3)
+    np = analytics._load_numpy()
+    if np is not None:
+        matrix = np.asarray(rewards)
+        numpy_s, numpy_stats = timed(lambda: analytics.rolling_reward_stats(matrix, stakes, taxes, windows))
+        report["numpy_s"] = round(numpy_s, 3)
+        report["speedup"] = round(python_s / numpy_s, 1)
+        report["max_relative_difference"] = max_difference(python_stats, numpy_stats)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
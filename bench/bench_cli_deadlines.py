@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""A collection cycle against a CLI that hangs on some commands.
+
+    python3 bench/bench_cli_deadlines.py [--hang srv_stake] [--budget 20]
+
+Runs main_task twice against bench/fake_cli.py: once healthy, then with
+FAKE_CLI_HANG set so the given commands never answer. Reports the wall
+time of each cycle, the circuit breaker state, the stale field groups of
+the published snapshot and whether any hung process (or its child) was
+left running. Results are printed as JSON.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "plugin"))
+sys.path.insert(0, BENCH_DIR)
+
+import bench_main_task  # noqa: E402
+import gen_history  # noqa: E402
+import hub  # noqa: E402
+
+
+def leftover_processes(marker):
+    out = subprocess.run(["ps", "-eo", "args"], capture_output=True, text=True).stdout
+    return [line for line in out.splitlines() if marker in line and "ps -eo" not in line]
+
+
+def cycle():
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        hub.main_task()
+    with open(hub.OUTPUT_FILE) as f:
+        snapshot = json.load(f)
+    return {
+        "wall_s": round(time.perf_counter() - started, 2),
+        "cli_circuit": snapshot["cli_circuit"],
+        "networks": sorted(snapshot["network_info"]),
+        "stale": {net: info["stale"] for net, info in snapshot["network_info"].items() if info["stale"]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hang", default="srv_stake", help="comma separated commands that never answer")
+    parser.add_argument("--budget", type=float, default=20, help="CLI_CYCLE_BUDGET in seconds")
+    parser.add_argument("--deadline", type=float, default=2, help="deadline of the hung commands")
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = os.path.join(work_dir, "data")
+        gen_history.generate(data_dir, 1000, 2, 60)
+        bench_main_task.configure(work_dir, data_dir)
+        os.environ["FAKE_CLI_LOG"] = os.path.join(work_dir, "spawned.log")
+        hub.CLI_SOCKET_ENABLED = False
+        hub.SINK_GDB_ENABLED = False
+        hub.CLI_CYCLE_BUDGET = opts.budget
+        hub.CLI_RETRY_BACKOFF = 0.2
+        for command in opts.hang.split(","):
+            hub.CLI_DEADLINES[command] = opts.deadline
+
+        report = {"healthy": cycle()}
+        os.environ["FAKE_CLI_HANG"] = opts.hang
+        report["hung"] = cycle()
+        report["hung_again"] = cycle()
+        time.sleep(0.5)
+        report["leftover_processes"] = leftover_processes("sleep 3600") + leftover_processes(data_dir)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Per-call latency and CPU cost of spawning the CLI versus the pooled socket client.
+
+    python3 bench/bench_cli_socket.py [--calls 200]
+
+Runs `version` through run_cli against bench/fake_cli.py and against
+bench/fake_cli_server.py; results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "plugin"))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_cli_server  # noqa: E402
+import hub  # noqa: E402
+
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def measure(calls):
+    wall = time.perf_counter()
+    cpu = cpu_seconds()
+    for _ in range(calls):
+        result = hub.run_cli(["version"])
+        assert result.returncode == 0, result.stderr
+    return {
+        "per_call_ms": round((time.perf_counter() - wall) / calls * 1000, 3),
+        "cpu_per_call_ms": round((cpu_seconds() - cpu) / calls * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    opts = parser.parse_args()
+
+    hub.CLI = os.path.join(BENCH_DIR, "fake_cli.py")
+    hub.CLI_SOCKET_ENABLED = False
+    report = {"calls": opts.calls, "subprocess": measure(opts.calls)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hub.CLI_SOCKET = os.path.join(tmp, "node_cli")
+        server = fake_cli_server.serve(hub.CLI_SOCKET)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        hub.CLI_SOCKET_ENABLED = True
+        try:
+            report["socket"] = measure(opts.calls)
+        finally:
+            server.shutdown()
+            server.server_close()
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
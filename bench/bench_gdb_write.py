@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Compares the per-key GDB write path against the batched publisher.
+
+    python3 bench/bench_gdb_write.py [--networks 3] [--delay-ms 5] [--rounds 3]
+
+Both paths run against bench/fake_cli.py; results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "plugin"))
+
+import hub  # noqa: E402
+
+
+def make_snapshot(networks):
+    today = time.strftime("%a, %d %b %Y")
+    return {
+        "node_addr": "0285::4B15::F4EC::52E5",
+        "hostname": "bench-host",
+        "service_uptime": "1d 2h 3m 4s",
+        "node_version": "5.3-360",
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "network_info": {
+            f"net{n}": {
+                "our_node_state": "NET_STATE_ONLINE",
+                "network_state": "NET_STATE_ONLINE",
+                "main_status": "synced",
+                "sync_percentage": "100.000 %",
+                "block_height": "123456",
+                "stake_value": "10.0",
+                "sovereign_addr_info": {"sovereign_addr": "N/A", "sovereign_tax": "0"},
+                "fee_addr_info": {
+                    "fee_addr": "fee",
+                    "ma7": {"date": today, "value": 1.5, "apy": 12.0},
+                    "ma30": {"date": today, "value": 1.4, "apy": 11.0},
+                    "rewards": {today: 1.5},
+                },
+            } for n in range(networks)
+        },
+    }
+
+
+def time_path(fn, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--networks", type=int, default=3)
+    parser.add_argument("--delay-ms", type=float, default=5)
+    parser.add_argument("--rounds", type=int, default=3)
+    opts = parser.parse_args()
+
+    os.environ["FAKE_CLI_DELAY_MS"] = str(opts.delay_ms)
+    hub.CLI = os.path.join(BENCH_DIR, "fake_cli.py")
+    records = hub.build_gdb_records(make_snapshot(opts.networks))
+
+    per_key, _ = time_path(
+        lambda: {k: hub.write_to_gdb("hub", k, v) for k, v in records.items()}, opts.rounds)
+    batched, results = time_path(lambda: hub.write_gdb_batch("hub", records), opts.rounds)
+    report = {
+        "keys": len(records),
+        "networks": opts.networks,
+        "per_key_s": round(per_key, 4),
+        "batched_s": round(batched, 4),
+        "speedup": round(per_key / batched, 2) if batched else None,
+        "batched_failures": sum(1 for ok in results.values() if not ok),
+    }
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Scrape latency of the local HTTP endpoint.
+
+    python3 bench/bench_http.py [--networks 3] [--scrapes 2000]
+
+Publishes a synthetic snapshot through the http sink, then scrapes
+/snapshot, /networks/<net> and /metrics over one keep-alive connection,
+with and without If-None-Match. run_cli is replaced by a function that
+fails the run, so any CLI call made while serving is caught. Results are
+printed as JSON.
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "plugin"))
+
+import hub  # noqa: E402
+
+
+def no_cli(*args, **kwargs):
+    raise AssertionError(f"CLI called while serving: {args}")
+
+
+def snapshot(networks):
+    info = {}
+    for i in range(networks):
+        rewards = {f"day {d}": 1.5 + d for d in range(30)}
+        info[f"net{i}"] = {
+            "our_node_state": "NET_STATE_ONLINE", "network_state": "NET_STATE_ONLINE",
+            "main_status": "synced", "sync_percentage": "100 %", "block_height": str(100000 + i),
+            "stake_value": "150000.0",
+            "sovereign_addr_info": {"sovereign_addr": "null", "sovereign_tax": 0.0},
+            "fee_addr_info": {"fee_addr": f"fee{i}", "rewards": rewards,
+                              "ma7": {"date": "Mon, 01 Jan 2024", "value": 12.5, "apy": 3.04},
+                              "ma30": {"date": "Mon, 01 Jan 2024", "value": 11.0, "apy": 2.67}},
+        }
+    for name in ("cli.net_get_status", "cli.tx_history", "stage.collect"):
+        hub.record_metric(name, 0.05)
+    return {"node_addr": "AAAA::BBBB::CCCC::DDDD", "hostname": "bench", "service_uptime": "1h",
+            "node_version": "5.3-1", "timestamp": "2024-01-01 00:00:00", "network_info": info,
+            "collector_metrics": hub.metrics_snapshot()}
+
+
+def scrape(conn, path, scrapes, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    started = time.perf_counter()
+    for _ in range(scrapes):
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        assert response.status == (304 if etag else 200), response.status
+    return round((time.perf_counter() - started) / scrapes * 1e6, 1), len(body), response.getheader("ETag")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--networks", type=int, default=3)
+    parser.add_argument("--scrapes", type=int, default=2000)
+    opts = parser.parse_args()
+
+    hub.run_cli = no_cli
+    hub.SINK_HTTP_ENABLED = True
+    hub.SINK_GDB_ENABLED = hub.SINK_FILE_ENABLED = False
+    hub.HTTP_PORT = 0
+    hub.publish_snapshot(snapshot(opts.networks))
+    hub.start_http_endpoint()
+    conn = http.client.HTTPConnection(hub.HTTP_HOST, hub.http_endpoint.port)
+    try:
+        results = {}
+        for path in ("/snapshot", "/networks/net0", "/metrics"):
+            full_us, size, etag = scrape(conn, path, opts.scrapes)
+            cached_us, _, _ = scrape(conn, path, opts.scrapes, etag)
+            results[path] = {"bytes": size, "per_request_us": full_us, "not_modified_us": cached_us}
+    finally:
+        conn.close()
+        hub.stop_http_endpoint()
+    print(json.dumps({"networks": opts.networks, "scrapes": opts.scrapes, "paths": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
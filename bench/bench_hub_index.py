@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Hub aggregator index against a synthetic hub group.
+
+    python3 bench/bench_hub_index.py [--nodes 5000] [--networks 3] [--queries 1000]
+
+Serves the group through a stand-in for the node's GlobalDB API and checks:
+  - the first refresh loads the group and snapshots it
+  - a restart with a recent snapshot does not load the group again
+  - a snapshot of another version is discarded for a full load
+  - a reload applies only the keys that changed
+  - removing keys, or replacing the group with an empty one, clears the
+    node from rankings, sync state, stake totals and the node table
+Query latency is measured on the loaded index. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "plugin"))
+
+import hub  # noqa: E402
+
+
+class FakeGlobalDB:
+    def __init__(self, records):
+        self.records = records
+        self.loads = 0
+
+    def set(self, key, group, value):
+        self.records[key] = value.decode()
+
+    def grLoad(self, group):
+        self.loads += 1
+        return [SimpleNamespace(key=key, value=value.encode()) for key, value in self.records.items()]
+
+
+def make_group(nodes, networks, rng):
+    records = {}
+    for n in range(nodes):
+        addr = "%016X" % rng.getrandbits(64)
+        records[f"{addr}_hostname"] = f"node{n}"
+        for i in range(networks):
+            prefix = f"{addr}_net{i}_"
+            records[prefix + "stake_value"] = str(rng.uniform(10000, 500000))
+            records[prefix + "fee_addr_info_ma30_apy"] = str(rng.uniform(0, 30))
+            records[prefix + "fee_addr_info_ma7_apy"] = str(rng.uniform(0, 30))
+            records[prefix + "main_status"] = "synced" if rng.random() > 0.1 else "syncing"
+            records[prefix + "sync_percentage"] = "100.000 %"
+    return records
+
+
+def restart(path):
+    hub.hub_index = None
+    hub.HUB_INDEX_FILE = path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--networks", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=1000)
+    opts = parser.parse_args()
+    rng = random.Random(1)
+
+    api = FakeGlobalDB(make_group(opts.nodes, opts.networks, rng))
+    hub._gdb_api, hub._gdb_api_loaded = api, True
+    with tempfile.TemporaryDirectory() as work:
+        path = os.path.join(work, "hub_index.json")
+        restart(path)
+        started = time.perf_counter()
+        index = hub.refresh_hub_index()
+        full_load_ms = (time.perf_counter() - started) * 1000
+        assert api.loads == 1 and len(index.records) == len(api.records)
+
+        restart(path)
+        started = time.perf_counter()
+        index = hub.refresh_hub_index()
+        snapshot_start_ms = (time.perf_counter() - started) * 1000
+        assert api.loads == 1, "restart with a recent snapshot loaded the group"
+        assert len(index.records) == len(api.records)
+
+        with open(path) as f:
+            snapshot = json.load(f)
+        snapshot["version"] = hub.HUB_INDEX_VERSION + 1
+        with open(path, "w") as f:
+            json.dump(snapshot, f)
+        restart(path)
+        index = hub.refresh_hub_index()
+        assert api.loads == 2 and len(index.records) == len(api.records)
+
+        stakes = [key for key in api.records if key.endswith("_stake_value")]
+        for key in rng.sample(stakes, 10):
+            api.records[key] = str(float(api.records[key]) + 1)
+        started = time.perf_counter()
+        changed = index.replace_all(dict(api.records))
+        reload_ms = (time.perf_counter() - started) * 1000
+        assert changed == 10, changed
+
+        # Removal: one node syncing on net0, then every key of it gone
+        addr = next(iter(index.nodes))
+        index.apply(f"{addr}_net0_main_status", "syncing")
+        assert addr in index.out_of_sync("net0")["net0"]
+        for key in [key for key in index.records if key.startswith(addr)]:
+            index.remove(key)
+        assert index.node(addr) is None
+        assert addr not in index.out_of_sync("net0")["net0"]
+        assert all(node != addr for _, node, _ in index.top("stake_value", opts.nodes))
+
+        started = time.perf_counter()
+        for _ in range(opts.queries):
+            index.top("ma30_apy", 10, "net0")
+            index.top("ma30_apy", 10)
+            index.out_of_sync("net0")
+        query_us = (time.perf_counter() - started) / (opts.queries * 3) * 1e6
+
+        index.replace_all({})
+        assert not index.nodes and not index.records and not index.rankings
+        assert index.out_of_sync() == {} and not index.stake_totals
+
+    print(json.dumps({
+        "nodes": opts.nodes,
+        "records": len(api.records),
+        "full_load_ms": round(full_load_ms, 2),
+        "restart_from_snapshot_ms": round(snapshot_start_ms, 2),
+        "group_loads": api.loads,
+        "reload_10_changed_ms": round(reload_ms, 2),
+        "query_us": round(query_us, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
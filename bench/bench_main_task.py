@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark of a main_task cycle against the fake CLI.
+
+    python3 bench/bench_main_task.py [--txs 1000 10000 100000] [--networks 3]
+                                     [--days 730] [--socket] [--out results.json]
+
+For every history size a synthetic data set is generated (gen_history.py)
+and each stage is timed: collectAllData (cold ledger), calculate_rewards
+(cold and warm ledger), generateFinalOutput (collection and all sinks)
+and publish_snapshot (sinks only). Before the last two every sink is made
+due and the GDB snapshot is dropped, so both include a full GDB write
+whatever the sink intervals. Each stage reports wall time, CPU
+time of this process and its children, peak RSS and the number of CLI
+processes spawned. Results are printed as JSON and optionally written to
+--out, so runs of different versions can be compared.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "plugin"))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_cli_server  # noqa: E402
+import gen_history  # noqa: E402
+import hub  # noqa: E402
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _peak_rss_mb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1 / 1024 if platform.system() == "Linux" else 1 / (1024 * 1024)
+    return round(max(own, children) * scale, 1)
+
+
+def _spawned(log):
+    if not os.path.exists(log):
+        return 0
+    with open(log) as f:
+        return sum(1 for _ in f)
+
+
+def run_stage(fn, log):
+    spawned = _spawned(log)
+    cpu = _cpu_seconds()
+    wall = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return {
+        "wall_s": round(time.perf_counter() - wall, 4),
+        "cpu_s": round(_cpu_seconds() - cpu, 4),
+        "peak_rss_mb": _peak_rss_mb(),
+        "subprocesses": _spawned(log) - spawned,
+    }
+
+
+def configure(work_dir, data_dir):
+    plugin_dir = os.path.join(work_dir, "plugin")
+    os.makedirs(plugin_dir, exist_ok=True)
+    hub.CLI = os.path.join(BENCH_DIR, "fake_cli.py")
+    hub.PLUGIN_PATH = plugin_dir
+    hub.OUTPUT_FILE = os.path.join(plugin_dir, "output.json")
+    hub.LEDGER_PATH = os.path.join(plugin_dir, "ledger")
+    hub.GDB_SNAPSHOT_FILE = os.path.join(plugin_dir, "gdb_snapshot.json")
+    hub.NETWORK_CONFIG_DIR = os.path.join(data_dir, "etc")
+    os.environ["FAKE_CLI_DATA"] = data_dir
+
+
+def bench_size(txs, opts, work_dir):
+    data_dir = os.path.join(work_dir, f"data-{txs}")
+    generated = time.perf_counter()
+    networks = gen_history.generate(data_dir, txs, opts.networks, opts.days)
+    generated = time.perf_counter() - generated
+    configure(work_dir, data_dir)
+    log = os.environ["FAKE_CLI_LOG"]
+    fee_addrs = [gen_history.fee_addr(net) for net in networks]
+
+    def reset_state():
+        shutil.rmtree(hub.LEDGER_PATH, ignore_errors=True)
+        # Otherwise the rewards job would skip networks synced by the previous history size
+        hub._rewards_marks.clear()
+        hub._rewards_synced.clear()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(hub.GDB_SNAPSHOT_FILE)
+
+    def all_sinks_due():
+        for sink in hub.sinks or []:
+            sink.last_run = None
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(hub.GDB_SNAPSHOT_FILE)
+
+    def calculate_all():
+        for addr in fee_addrs:
+            hub.calculate_rewards(addr)
+
+    reset_state()
+    stages = {"collectAllData": run_stage(hub.collectAllData, log)}
+    reset_state()
+    stages["calculate_rewards_cold"] = run_stage(calculate_all, log)
+    stages["calculate_rewards_warm"] = run_stage(calculate_all, log)
+    snapshots = []
+    all_sinks_due()
+    stages["generateFinalOutput"] = run_stage(lambda: snapshots.append(hub.generateFinalOutput()), log)
+    all_sinks_due()
+    stages["publish_snapshot"] = run_stage(lambda: hub.publish_snapshot(snapshots[0]), log)
+    shutil.rmtree(data_dir)
+    return {"txs_per_network": txs, "networks": opts.networks, "generate_s": round(generated, 2), "stages": stages}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--txs", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="history sizes per network (up to 1000000)")
+    parser.add_argument("--networks", type=int, default=3)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--socket", action="store_true", help="serve the fake CLI over the CLI socket")
+    parser.add_argument("--out")
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ["FAKE_CLI_LOG"] = os.path.join(work_dir, "spawned.log")
+        server = None
+        hub.CLI_SOCKET = os.path.join(work_dir, "node_cli")
+        hub.CLI_SOCKET_ENABLED = opts.socket
+        if opts.socket:
+            server = fake_cli_server.serve(hub.CLI_SOCKET)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            runs = [bench_size(txs, opts, work_dir) for txs in opts.txs]
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+    report = {
+        "commit": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                 capture_output=True, text=True).stdout.strip() or None,
+        "python": platform.python_version(),
+        "transport": "socket" if opts.socket else "subprocess",
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if opts.out:
+        with open(opts.out, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
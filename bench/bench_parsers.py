@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Golden-fixture check and throughput micro-benchmark for the CLI output parsers.
+
+    python3 bench/bench_parsers.py                    # check + measure + compare to baseline
+    python3 bench/bench_parsers.py --update-golden    # rewrite fixtures/expected.json
+    python3 bench/bench_parsers.py --update-baseline  # rewrite parser_baseline.json
+
+Exits non-zero if a parser disagrees with the golden output or is slower
+than the baseline by more than --tolerance. Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+GOLDEN = os.path.join(FIXTURES, "expected.json")
+BASELINE = os.path.join(BENCH_DIR, "parser_baseline.json")
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "plugin"))
+
+import hub  # noqa: E402
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def _slots(record):
+    value = {field: getattr(record, field) for field in record.__slots__}
+    if isinstance(value.get("created"), hub.datetime):
+        value["created"] = value["created"].isoformat()
+    return value
+
+
+# fixture -> (parser name, function returning a list of JSON-able records)
+PARSERS = {
+    "net_get_status.txt": ("net_get_status", lambda text: [_slots(hub.parse_net_status(text))]),
+    "net_get_status_reordered.txt": ("net_get_status", lambda text: [_slots(hub.parse_net_status(text))]),
+    "srv_stake_list_keys.txt": ("srv_stake_list_keys", lambda text: [_slots(k) for k in hub.parse_stake_keys(text)]),
+    "tx_history.txt": ("tx_history", lambda text: [_slots(t) for t in hub.parse_tx_history(text.splitlines())]),
+    "version.txt": ("version", lambda text: [_slots(hub.parse_version(text))]),
+}
+
+
+def parse_all():
+    return {name: parse(read_fixture(name)) for name, (_, parse) in PARSERS.items()}
+
+
+def measure(min_seconds):
+    """Records/s and MB/s per parser, each fixture repeated until `min_seconds` elapsed."""
+    results = {}
+    for name, (parser, parse) in PARSERS.items():
+        text = read_fixture(name)
+        if parser == "tx_history":
+            # A realistic history is long; scale the fixture so per-call overhead does not dominate
+            text = text * 2000
+        records = len(parse(text))
+        runs = 0
+        start = time.perf_counter()
+        while True:
+            parse(text)
+            runs += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                break
+        entry = results.setdefault(parser, {"records_per_s": [], "mb_per_s": []})
+        entry["records_per_s"].append(records * runs / elapsed)
+        entry["mb_per_s"].append(len(text.encode()) * runs / elapsed / 1e6)
+    return {
+        parser: {metric: round(min(values), 1) for metric, values in entry.items()}
+        for parser, entry in results.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-seconds", type=float, default=0.5)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown against the baseline (0.5 = half as fast)")
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--update-baseline", action="store_true")
+    opts = parser.parse_args()
+
+    parsed = parse_all()
+    if opts.update_golden:
+        with open(GOLDEN, "w") as f:
+            json.dump(parsed, f, indent=4, sort_keys=True)
+            f.write("\n")
+    with open(GOLDEN) as f:
+        golden = json.load(f)
+    mismatches = sorted(name for name in PARSERS if parsed[name] != golden.get(name))
+
+    throughput = measure(opts.min_seconds)
+    if opts.update_baseline:
+        with open(BASELINE, "w") as f:
+            json.dump(throughput, f, indent=4, sort_keys=True)
+            f.write("\n")
+    regressions = []
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        for name, metrics in baseline.items():
+            current = throughput.get(name, {}).get("mb_per_s", 0)
+            if current < metrics["mb_per_s"] * (1 - opts.tolerance):
+                regressions.append(name)
+
+    print(json.dumps({"golden_mismatches": mismatches, "regressions": regressions, "throughput": throughput}))
+    return 1 if mismatches or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
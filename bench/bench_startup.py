@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Plugin load and reload time, as the node sees them.
+
+    python3 bench/bench_startup.py [--runs 10]
+
+Each run starts a fresh interpreter and times:
+  load    import hub + init()
+  reload  deinit() + importlib.reload(hub) + init()
+  stop    the final deinit()
+It also reports the heavy modules present after load, the CLI processes
+spawned (should be none: the first collection is deferred) and the threads
+left over after deinit(). Results (median of the runs) are printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PLUGIN_DIR = os.path.join(BENCH_DIR, "..", "plugin")
+
+CHILD = r"""
+import importlib, json, os, sys, threading, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import hub
+hub.CLI = os.path.join(sys.argv[2], "fake_cli.py")
+hub.init()
+load = time.perf_counter() - started
+heavy = [m for m in ("requests", "psutil", "subprocess", "asyncio", "numpy") if m in sys.modules]
+started = time.perf_counter()
+hub.deinit()
+hub = importlib.reload(hub)
+hub.CLI = os.path.join(sys.argv[2], "fake_cli.py")
+hub.init()
+reload = time.perf_counter() - started
+started = time.perf_counter()
+hub.deinit()
+stop = time.perf_counter() - started
+print(json.dumps({"load_ms": load * 1000, "reload_ms": reload * 1000, "stop_ms": stop * 1000,
+                  "heavy_modules": heavy, "threads_after_deinit": threading.active_count() - 1}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        log = os.path.join(work_dir, "spawned.log")
+        env = dict(os.environ, FAKE_CLI_LOG=log, PYTHONDONTWRITEBYTECODE="1")
+        runs = []
+        for _ in range(opts.runs):
+            out = subprocess.run([sys.executable, "-c", CHILD, PLUGIN_DIR, BENCH_DIR],
+                                 capture_output=True, text=True, env=env, check=True).stdout
+            runs.append(json.loads(out.strip().splitlines()[-1]))
+        spawned = sum(1 for _ in open(log)) if os.path.exists(log) else 0
+
+    print(json.dumps({
+        "runs": opts.runs,
+        "load_ms": round(statistics.median(r["load_ms"] for r in runs), 2),
+        "reload_ms": round(statistics.median(r["reload_ms"] for r in runs), 2),
+        "stop_ms": round(statistics.median(r["stop_ms"] for r in runs), 2),
+        "heavy_modules_after_load": runs[-1]["heavy_modules"],
+        "cli_processes_spawned": spawned,
+        "threads_after_deinit": max(r["threads_after_deinit"] for r in runs),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Exercises the plugin updater against a local HTTP server.
+
+    python3 bench/bench_updater.py [--checks 50]
+
+Serves a release (manifest.json with checksums + hub.py) from a temp dir and
+checks:
+  - an older install is updated, verified and swapped atomically
+  - later checks are conditional (304) and transfer no body
+  - "1.15" is newer than "1.9"
+  - a hub.py not matching the manifest checksum is rejected
+Results are printed as JSON.
+"""
+import argparse
+import hashlib
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "plugin"))
+
+import hub  # noqa: E402
+
+stats = {"requests": 0, "not_modified": 0, "body_bytes": 0}
+
+
+class ReleaseHandler(http.server.BaseHTTPRequestHandler):
+    release_dir = None
+
+    def do_GET(self):
+        stats["requests"] += 1
+        path = os.path.join(self.release_dir, os.path.basename(self.path))
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+        except OSError:
+            self.send_error(404)
+            return
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            stats["not_modified"] += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        stats["body_bytes"] += len(body)
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def write_release(release_dir, version, hub_source, checksum=None):
+    with open(os.path.join(release_dir, "hub.py"), "wb") as f:
+        f.write(hub_source)
+    manifest = {"name": "hub", "version": version,
+                "files": {"hub.py": checksum or hashlib.sha256(hub_source).hexdigest()}}
+    with open(os.path.join(release_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+
+def install(plugin_dir, version):
+    with open(os.path.join(plugin_dir, "manifest.json"), "w") as f:
+        json.dump({"name": "hub", "version": version}, f)
+    with open(os.path.join(plugin_dir, "hub.py"), "wb") as f:
+        f.write(b"# installed\n")
+    if os.path.exists(hub.UPDATE_STATE_FILE):
+        os.remove(hub.UPDATE_STATE_FILE)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=50)
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        release_dir = os.path.join(work, "release")
+        plugin_dir = os.path.join(work, "plugin") + os.sep
+        os.makedirs(release_dir)
+        os.makedirs(plugin_dir)
+        ReleaseHandler.release_dir = release_dir
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ReleaseHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = "http://127.0.0.1:%d/" % server.server_address[1]
+
+        hub.REMOTE_MANIFEST_URL = base + "manifest.json"
+        hub.REMOTE_HUB_URL = base + "hub.py"
+        hub.PLUGIN_PATH = plugin_dir
+        hub.LOCAL_MANIFEST = os.path.join(plugin_dir, "manifest.json")
+        hub.UPDATE_STATE_FILE = os.path.join(plugin_dir, "update_state.json")
+        reloads = []
+        hub.reload_plugin = lambda: reloads.append(time.time())
+
+        new_source = b"# release 1.15\n" * 4096
+        write_release(release_dir, "1.15", new_source)
+        install(plugin_dir, "1.9")
+
+        started = time.perf_counter()
+        updated = hub.update_plugin_if_needed()
+        first_ms = (time.perf_counter() - started) * 1000
+        with open(os.path.join(plugin_dir, "hub.py"), "rb") as f:
+            swapped = f.read() == new_source
+        assert updated and swapped and len(reloads) == 1
+        assert hub.get_version_from_manifest(hub.LOCAL_MANIFEST) == "1.15"
+        assert not os.path.exists(os.path.join(plugin_dir, "hub.py.download"))
+
+        stats.update(requests=0, not_modified=0, body_bytes=0)
+        started = time.perf_counter()
+        for _ in range(opts.checks):
+            assert not hub.update_plugin_if_needed()
+        check_ms = (time.perf_counter() - started) / opts.checks * 1000
+        assert stats["not_modified"] == opts.checks and stats["body_bytes"] == 0
+        assert len(reloads) == 1
+
+        write_release(release_dir, "1.16", b"# tampered\n", checksum="0" * 64)
+        install(plugin_dir, "1.15")
+        rejected = not hub.update_plugin_if_needed()
+        with open(os.path.join(plugin_dir, "hub.py"), "rb") as f:
+            assert f.read() == b"# installed\n"
+        assert rejected and hub.get_version_from_manifest(hub.LOCAL_MANIFEST) == "1.15"
+        assert not os.path.exists(os.path.join(plugin_dir, "hub.py.download"))
+
+        server.shutdown()
+
+    print(json.dumps({
+        "update_ms": round(first_ms, 3),
+        "conditional_check_ms": round(check_ms, 3),
+        "conditional_checks": opts.checks,
+        "body_bytes_on_conditional_checks": 0,
+        "semantic_version_compare": hub.is_newer_version("1.15", "1.9") and not hub.is_newer_version("1.9", "1.15"),
+        "tampered_release_rejected": rejected,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Stand-in for cellframe-node-cli used by the benchmarks.
+
+Point hub.CLI at this file. Commands are taken from argv, or read one per
+line from stdin when started without arguments (like the real interactive
+shell). Environment:
+
+    FAKE_CLI_DATA       directory written by gen_history.py; answers net list,
+                        net get status, srv_stake list keys and tx_history
+    FAKE_CLI_DELAY_MS   simulated round trip to the node per command
+    FAKE_CLI_LOG        file that gets one line appended per process start
+    FAKE_CLI_HANG       comma separated first words of commands that never
+                        answer; the hung process also starts a child, so
+                        callers must kill the whole process group
+    FAKE_CLI_FAIL_KEYS  comma separated GDB keys whose global_db write or
+                        delete is answered with an error
+
+Error replies make a command started from argv exit with status 1.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _option(args, name):
+    if name in args and args.index(name) + 1 < len(args):
+        return args[args.index(name) + 1]
+    return None
+
+
+def _data_file(*parts):
+    data = os.environ.get("FAKE_CLI_DATA")
+    if not data:
+        return None
+    path = os.path.join(data, *parts)
+    return path if os.path.exists(path) else None
+
+
+def resolve(args):
+    """Returns ("text", output) or ("file", path whose content is the output)."""
+    delay = float(os.environ.get("FAKE_CLI_DELAY_MS", "0"))
+    if delay:
+        time.sleep(delay / 1000)
+    if args[:1] and args[0] in os.environ.get("FAKE_CLI_HANG", "").split(","):
+        subprocess.Popen(["sleep", "3600"])
+        time.sleep(3600)
+    if args[:1] == ["version"]:
+        return "text", "cellframe-node version 5.3-360\n"
+    if args[:2] in (["global_db", "write"], ["global_db", "delete"]) and \
+            _option(args, "-key") in os.environ.get("FAKE_CLI_FAIL_KEYS", "").split(","):
+        return "text", f"Error: can't {args[1]} key {_option(args, '-key')}\n"
+    if args[:2] == ["global_db", "write"]:
+        return "text", "Data has been successfully written to the database\n"
+    if args[:2] == ["global_db", "delete"]:
+        return "text", "Record successfully deleted\n"
+    if args[:2] == ["net", "list"]:
+        path = _data_file("networks.txt")
+        names = open(path).read().split() if path else ["Backbone"]
+        return "text", "networks:\n\t" + ", ".join(names) + "\n"
+    if args[:3] == ["net", "get", "status"]:
+        path = _data_file("status", f"{_option(args, '-net')}.txt")
+        return "file", path or os.path.join(FIXTURES, "net_get_status.txt")
+    if args[:3] == ["srv_stake", "list", "keys"]:
+        path = _data_file("stake", f"{_option(args, '-net')}.txt")
+        return "file", path or os.path.join(FIXTURES, "srv_stake_list_keys.txt")
+    if args[:1] == ["tx_history"]:
+        path = _data_file("history", f"{_option(args, '-addr')}.txt")
+        return "file", path or os.path.join(FIXTURES, "tx_history.txt")
+    return "text", f"Unknown command: {' '.join(args)}\n"
+
+
+def handle(args):
+    kind, value = resolve(args)
+    if kind == "file":
+        with open(value) as f:
+            return f.read()
+    return value
+
+
+def write(args, out):
+    """Writes the reply to `out`; returns False when it is an error reply."""
+    kind, value = resolve(args)
+    if kind == "file":
+        with open(value) as f:
+            shutil.copyfileobj(f, out, 1 << 16)
+        return True
+    out.write(value)
+    return not value.startswith(("Error", "Unknown command"))
+
+
+def main():
+    log = os.environ.get("FAKE_CLI_LOG")
+    if log:
+        with open(log, "a") as f:
+            f.write(" ".join(sys.argv[1:2]) + "\n")
+    try:
+        if len(sys.argv) > 1:
+            return 0 if write(sys.argv[1:], sys.stdout) else 1
+        for line in sys.stdin:
+            args = line.split()
+            if args:
+                write(args, sys.stdout)
+    except BrokenPipeError:
+        # The reader stopped early (reward window reached)
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Stand-in for the node's CLI server socket used by the benchmarks.
+
+    python3 bench/fake_cli_server.py /tmp/node_cli
+
+Speaks the cellframe-node-cli request framing over a unix socket with
+keep-alive, answering every command with the canned output of
+bench/fake_cli.py. Point hub.CLI_SOCKET at the socket path.
+"""
+import os
+import shutil
+import socketserver
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_cli  # noqa: E402
+
+
+class CliHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            request_line = self.rfile.readline()
+            if not request_line:
+                return
+            length = 0
+            while True:
+                line = self.rfile.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            body = self.rfile.read(length).decode()
+            args = [arg for arg in body.split("\r\n") if arg]
+            kind, value = fake_cli.resolve(args)
+            if kind == "file":
+                length = os.path.getsize(value)
+                with open(value, "rb") as f:
+                    self._head(length)
+                    try:
+                        shutil.copyfileobj(f, self.wfile, 1 << 16)
+                    except BrokenPipeError:
+                        return
+            else:
+                output = value.encode()
+                self._head(len(output))
+                self.wfile.write(output)
+            self.wfile.flush()
+
+    def _head(self, length):
+        self.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
+                         + f"Content-Length: {length}\r\n\r\n".encode())
+
+
+class CliServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path):
+    """Starts the server on `path`; returns it so callers can shut it down."""
+    if os.path.exists(path):
+        os.unlink(path)
+    return CliServer(path, CliHandler)
+
+
+if __name__ == "__main__":
+    server = serve(sys.argv[1] if len(sys.argv) > 1 else "/tmp/node_cli")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
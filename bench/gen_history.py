@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Synthetic node data for bench/fake_cli.py.
+
+    python3 bench/gen_history.py DATA_DIR [--txs 100000] [--networks 3] [--days 730]
+
+Writes, for every network netN:
+    DATA_DIR/networks.txt              names answered by `net list`
+    DATA_DIR/status/netN.txt           `net get status` output
+    DATA_DIR/stake/netN.txt            `srv_stake list keys` output
+    DATA_DIR/history/<fee_addr>.txt    `tx_history` output, newest first
+    DATA_DIR/etc/netN.cfg              network config with blocks-sign-cert and fee_addr
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+STATUS = """status:
+  name: {net}
+  current_addr: 0285::4B15::F4EC::52E5
+  states:
+    current: NET_STATE_ONLINE
+    target: NET_STATE_ONLINE
+  processed:
+    main:
+      status: synced
+      current: {height}
+      in network: {height}
+      percent: 100.000 %
+"""
+
+STAKE = """keys:
+    node_addr: 0285::4B15::F4EC::52E5
+    pkey_hash: 0x{seed:064X}
+    stake_value: 10000.0
+    tx_hash: 0x{seed:064X}
+    sovereign_addr: null
+    sovereign_tax: 5.0
+"""
+
+REWARD_TX = """status: ACCEPTED
+hash: 0x{hash:064X}
+tx_created: {created}
+data:
+    tx_type: recv
+    recv_coins: {coins:.18f}
+    recv_datoshi: {datoshi}
+    token: CELL
+    source_address: reward collecting
+"""
+
+SEND_TX = """status: ACCEPTED
+hash: 0x{hash:064X}
+tx_created: {created}
+data:
+    tx_type: send
+    send_coins: {coins:.18f}
+    send_datoshi: {datoshi}
+    token: CELL
+    destination_address: Rj7J7MiX2bWy8sNyX8w7gPRPEr2YhJx9yBjkB7GmrA5k6EZxz2rx6Jo3pkJyhQq3cB6Hxj4QCXnsw1WoY9UkwC3Tq
+"""
+
+
+def fee_addr(net):
+    return f"fee{net}Rj7J7MiX2bWy8sNyX8w7gPRPEr2YhJx9yBjkB7GmrA5k6EZxz2rx"
+
+
+def write_history(path, txs, days, seed, now=None):
+    """Writes `txs` transactions spread evenly over `days`, newest first; 1 in 20 is a send."""
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    step = timedelta(days=days) / max(txs, 1)
+    with open(path, "w") as f:
+        for i in range(txs):
+            created = (now - step * i).strftime("%a, %d %b %Y %H:%M:%S")
+            coins = rng.uniform(0.1, 5.0)
+            template = SEND_TX if i % 20 == 19 else REWARD_TX
+            f.write(template.format(hash=(seed << 32) + i, created=created,
+                                    coins=coins, datoshi=int(coins * 10 ** 18)))
+
+
+def generate(data_dir, txs, networks, days, now=None):
+    """Writes a complete data set; returns the network names."""
+    names = [f"net{n}" for n in range(networks)]
+    for sub in ("status", "stake", "history", "etc"):
+        os.makedirs(os.path.join(data_dir, sub), exist_ok=True)
+    with open(os.path.join(data_dir, "networks.txt"), "w") as f:
+        f.write("\n".join(names) + "\n")
+    for n, net in enumerate(names):
+        with open(os.path.join(data_dir, "status", f"{net}.txt"), "w") as f:
+            f.write(STATUS.format(net=net, height=600000 + n))
+        with open(os.path.join(data_dir, "stake", f"{net}.txt"), "w") as f:
+            f.write(STAKE.format(seed=n + 1))
+        with open(os.path.join(data_dir, "etc", f"{net}.cfg"), "w") as f:
+            f.write(f"[general]\nname={net}\n\n[esbocs]\nblocks-sign-cert={net}.cert\nfee_addr={fee_addr(net)}\n")
+        write_history(os.path.join(data_dir, "history", f"{fee_addr(net)}.txt"), txs, days, n + 1, now)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("data_dir")
+    parser.add_argument("--txs", type=int, default=100000, help="transactions per network")
+    parser.add_argument("--networks", type=int, default=3)
+    parser.add_argument("--days", type=int, default=730, help="days the history spans")
+    opts = parser.parse_args()
+    generate(opts.data_dir, opts.txs, opts.networks, opts.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,139 @@
+import bisect
+import contextvars
+import copy
+import hashlib
+import heapq
+import importlib
 import json
+import mmap
 import os
-import requests
+import random
 import threading
 import time
-import subprocess
 import socket
-import psutil
+import struct
 import re
-from datetime import datetime, timedelta
-import socket
+import signal
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 
 # Paths for the updater
 LOCAL_MANIFEST = "/opt/cellframe-node/var/lib/plugins/hub/manifest.json"
 REMOTE_MANIFEST_URL = "https://raw.githubusercontent.com/nocdem/cellframehub/refs/heads/main/plugin/manifest.json"
 REMOTE_HUB_URL = "https://raw.githubusercontent.com/nocdem/cellframehub/refs/heads/main/plugin/hub.py"
 PLUGIN_PATH = "/opt/cellframe-node/var/lib/plugins/hub/"
+OUTPUT_FILE = os.path.join(PLUGIN_PATH, "output.json")
+NETWORK_CONFIG_DIR = "/opt/cellframe-node/etc/network"
 
 # Cached Data Storage
 cached_data = {
-    'hostname': socket.gethostname(),
+    'hostname': None,  # Looked up on first use, see getHostname
     'our_node_address': None  # Store our node's address here
 }
 CLI = "/opt/cellframe-node/bin/cellframe-node-cli"  # Path to cellframe-node-cli binary
+CLI_MAX_CONCURRENCY = 4  # Upper bound on cellframe-node-cli processes running at the same time
+COLLECT_WORKERS = 8  # Worker threads of the collection phase
+_cli_slots = threading.BoundedSemaphore(CLI_MAX_CONCURRENCY)
+_node_address_lock = threading.Lock()
+# Run a cellframe-node-cli command, never more than CLI_MAX_CONCURRENCY at once.
+# Deadlines, retries and the circuit breaker are described under CLI EXECUTOR.
+def run_cli(args, timeout=None, input=None):
+    attempt = 0
+    while True:
+        limit = cli_timeout(args, timeout)
+        if not cli_breaker.allow():
+            raise CliUnavailable("CLI circuit open")
+        try:
+            result = _run_cli_once(args, limit, input, retry=attempt > 0)
+        except (CliTimeout, OSError) as e:
+            if isinstance(e, (FileNotFoundError, PermissionError)):
+                raise  # Missing or unusable CLI binary, retrying would not help
+            cli_breaker.failure()
+            attempt += 1
+            delay = _retry_delay(attempt) if attempt <= CLI_RETRIES else None
+            if delay is None:
+                raise
+            print(f"CLI call {' '.join(cli_command_words(args)) or 'batch'} failed ({e}), retrying in {delay:.1f}s")
+            if _shutdown.wait(delay):
+                raise
+            continue
+        cli_breaker.success()
+        return result
+# Take a CLI slot if one frees up before `deadline`; returns the seconds left for the command itself
+def _acquire_cli_slot(deadline):
+    if _cli_slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            return remaining
+        _cli_slots.release()
+    raise CliUnavailable("no free CLI slot before the deadline")
+# One attempt of a command; `retry` marks attempts made by run_cli after a failure, counted in its metrics
+def _run_cli_once(args, timeout, input, retry=False):
+    timeout = _acquire_cli_slot(time.monotonic() + timeout)
+    started = time.perf_counter()
+    retries = int(retry)
+    result = None
+    try:
+        pool = get_cli_socket_pool()
+        if pool is not None:
+            try:
+                result = pool.run(args, timeout, input)
+                return result
+            except socket.timeout:
+                raise CliTimeout(f"{' '.join(cli_command_words(args)) or 'batch'} timed out after {timeout:.0f}s")
+            except (OSError, CliSocketError) as e:
+                disable_cli_socket(e)
+                retries += 1
+        result = _spawn_cli(args, timeout, input)
+        return result
+    finally:
+        _cli_slots.release()
+        record_cli(args, time.perf_counter() - started,
+                   result.returncode if result is not None else None,
+                   len(result.stdout) if result is not None and result.stdout else 0, retries)
+# Set by deinit(): CLI calls fail at once and retries stop waiting, so running jobs end quickly
+_shutdown = threading.Event()
+# Called by the node when the plugin is loaded; returns at once, the first collection is deferred
 def init():
-    t = threading.Thread(target=run_periodically, args=(30,))  # Start the periodic task every 30 minutes
-    t.start()
+    global scheduler
+    _shutdown.clear()
+    scheduler = build_scheduler()  # Independent intervals per job, see SCHEDULED JOBS
+    scheduler.start()
+    if SINK_HTTP_ENABLED:
+        start_http_endpoint(wait=False)
     return 0
+# Called by the node on shutdown and plugin reload
 def deinit():
-    #  deinitialization
+    global scheduler
+    _shutdown.set()
+    if scheduler is not None:
+        scheduler.stop()
+        scheduler = None
+    stop_http_endpoint()
+    close_cli_socket_pool()
     return 0
+# Our hostname, looked up once
+def getHostname():
+    if cached_data['hostname'] is None:
+        cached_data['hostname'] = socket.gethostname()
+    return cached_data['hostname']
 # Get service uptime
 def getServiceUptime():
+    if os.path.isdir(node_sampler.proc_root):
+        try:
+            summary = node_sampler.latest or node_sampler.sample()
+            if summary is None:
+                return "cellframe-node process not found"
+            # The cached sample may be a few seconds old; the start time is what matters
+            return formatUptime(time.time() - node_sampler._boot_time()
+                                - node_sampler.start_ticks / node_sampler.clock_ticks)
+        except (OSError, ValueError) as e:
+            print(f"Error reading /proc, falling back to psutil: {e}")
     try:
+        import psutil  # Only needed without /proc
         for proc in psutil.process_iter(['pid', 'name', 'create_time']):
             if proc.info['name'] == "cellframe-node":
                 uptime_seconds = time.time() - proc.info['create_time']
@@ -48,22 +150,22 @@ def formatUptime(seconds):
 # Get the node version
 def getNodeVersion():
     try:
-        result = subprocess.run([CLI, "version"], capture_output=True, text=True, timeout=120)
+        result = run_cli(["version"])
         if result.returncode == 0:
-            return result.stdout.strip().split()[-1]  # Extract the version part only
+            return parse_version(result.stdout).version
         else:
             return f"Error: {result.stderr}"
     except Exception as e:
         return f"Error: {str(e)}"
-# Fetch network names
+# Fetch network names; reused until the network config directory changes
 def getNetworkNames():
+    global _network_list
+    signature = config_dir_signature()
+    cached = _network_list
+    if cached is not None and cached[0] == signature and time.monotonic() - cached[1] < NETWORK_LIST_TTL:
+        return list(cached[2])
     try:
-        result = subprocess.run(
-            [CLI, "net", "list"],
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
+        result = run_cli(["net", "list"])
         if result.returncode == 0:
             networks = result.stdout.strip().split("\n")
             individual_networks = []
@@ -71,7 +173,9 @@ def getNetworkNames():
                 if not net.startswith("networks:"):
                     individual_networks.extend([n.strip() for n in net.split(",") if n.strip()])
             print(f"Detected networks: {individual_networks}")
-            return individual_networks
+            if individual_networks:
+                _network_list = (signature, time.monotonic(), individual_networks)
+            return list(individual_networks)
         else:
             print(f"Error running net list command: {result.stderr}")
             return []
@@ -81,12 +185,7 @@ def getNetworkNames():
 # Fetch network status for each network
 def getNetworkStatus(network):
     try:
-        result = subprocess.run(
-            [CLI, "net", "get", "status", "-net", network],
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
+        result = run_cli(["net", "get", "status", "-net", network])
         if result.returncode == 0:
             return parseNetworkStatus(result.stdout.strip())
         else:
@@ -95,66 +194,46 @@ def getNetworkStatus(network):
         return f"Error: {str(e)}"
 # Parse network status output
 def parseNetworkStatus(output):
-    network_info = {}
-    lines = output.splitlines()
-    for i, line in enumerate(lines):
-        if "current:" in line and "NET_STATE" in line:
-            network_info['our_node_state'] = line.split(":")[1].strip()
-        elif "target:" in line and "NET_STATE" in line:
-            network_info['network_state'] = line.split(":")[1].strip()
-        elif "main:" in line:
-            block_height = lines[i + 3].split(":")[1].strip()
-            sync_percent = lines[i + 4].split(":")[1].strip()
-            main_status = lines[i + 1].split(":")[1].strip()
-            network_info['block_height'] = block_height
-            network_info['sync_percentage'] = sync_percent
-            network_info['main_status'] = main_status
-        elif "current_addr:" in line:
-            node_address = line.split(":", 1)[1].strip()
-            cached_data['our_node_address'] = node_address
-            print(f"Detected node address: {cached_data['our_node_address']}")
-    if not cached_data['our_node_address']:
+    network_info = parse_net_status(output).as_dict()
+    if 'node_address' in network_info:
+        print(f"Detected node address: {network_info['node_address']}")
+        setOurNodeAddress(network_info['node_address'])
+    elif not cached_data['our_node_address']:
         print("Warning: No node address detected in network status output.")
     return network_info
-# Read network config file and return blocks_sign_cert and fee_addr
+# Store our node address; status of several networks may be parsed concurrently
+def setOurNodeAddress(node_address):
+    with _node_address_lock:
+        cached_data['our_node_address'] = node_address
+# Read network config file and return blocks_sign_cert and fee_addr; parsed once per file change
 def readNetworkConfig(network):
-    config_file = f"/opt/cellframe-node/etc/network/{network}.cfg"
     net_config = {}
     try:
-        with open(config_file, "r") as file:
-            text = file.read()
-        # Extract blocks-sign-cert
-        pattern_cert = r"^blocks-sign-cert=(.+)"
-        cert_match = re.search(pattern_cert, text, re.MULTILINE)
-        if cert_match:
-            net_config['blocks_sign_cert'] = cert_match.group(1).strip()
-        else:
-            print(f"Warning: blocks-sign-cert not found in {network}.cfg")
-        # Extract fee_addr
-        pattern_fee = r"^fee_addr=(.+)"
-        fee_match = re.search(pattern_fee, text, re.MULTILINE)
-        if fee_match:
-            net_config['fee_addr'] = fee_match.group(1).strip()
-            print(f"Detected fee_addr: {net_config['fee_addr']}")  # Debugging statement
-        else:
-            print(f"Warning: fee_addr not found in {network}.cfg")
-        return net_config
-    except FileNotFoundError:
-        print(f"Error: Config file for network {network} not found.")
-        return None
+        sections = config_cache.get(network_config_path(network))
     except Exception as e:
         print(f"Error reading {network}.cfg: {str(e)}")
         return None
+    if sections is None:
+        print(f"Error: Config file for network {network} not found.")
+        return None
+    # Validators set both in the [esbocs] section; older configs have them anywhere
+    blocks_sign_cert = cfg_value(sections, "blocks-sign-cert", prefer=("esbocs",))
+    if blocks_sign_cert:
+        net_config['blocks_sign_cert'] = blocks_sign_cert
+    else:
+        print(f"Warning: blocks-sign-cert not found in {network}.cfg")
+    fee_addr = cfg_value(sections, "fee_addr", prefer=("esbocs",))
+    if fee_addr:
+        net_config['fee_addr'] = fee_addr
+        print(f"Detected fee_addr: {net_config['fee_addr']}")  # Debugging statement
+    else:
+        print(f"Warning: fee_addr not found in {network}.cfg")
+    return net_config
 # Get stake info
 def getStakeInfo(network, blocks_sign_cert):
     if blocks_sign_cert:
         try:
-            result = subprocess.run(
-                [CLI, "srv_stake", "list", "keys", "-net", network, "-cert", blocks_sign_cert],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            result = run_cli(["srv_stake", "list", "keys", "-net", network, "-cert", blocks_sign_cert])
             if result.returncode == 0:
                 return parseStakeInfo(result.stdout.strip())
             else:
@@ -163,101 +242,904 @@ def getStakeInfo(network, blocks_sign_cert):
             return f"Error: {str(e)}"
     return None
 # Parse the stake information output
-
 def parseStakeInfo(output):
-    stake_info = {}
-    lines = output.splitlines()
+    # Defaults ensure the keys are always set
+    stake_info = {'stake_value': "0", 'sovereign_addr': "N/A", 'sovereign_tax': "0"}
+    keys = parse_stake_keys(output)
+    if keys:
+        for field in stake_info:
+            value = getattr(keys[0], field)
+            if value is not None:
+                stake_info[field] = value
+    return stake_info
+
+# -------------- CLI OUTPUT PARSERS ----------------
+
+# "key: value" or "key:" (section header) with its indentation
+_KEY_VALUE = re.compile(r'^(\s*)([^:\n]+?):[ \t]*(.*?)\s*$')
+# Fields of a tx_history record the reward indexer cares about
+_TX_FIELD = re.compile(r'^\s*(hash|status|tx_created|recv_coins|source_address):\s*(.*?)\s*$')
+# Keys that appear once per transaction; seeing one again starts the next record
+_TX_RECORD_KEYS = frozenset(("hash", "status", "tx_created"))
+_TX_CREATED = re.compile(r'(\d{1,2}) (\w{3}) (\d{4}) (\d{1,2}):(\d{2}):(\d{2})')
+_MONTHS = {m: i for i, m in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+# Keys of a srv_stake key record; seeing one again starts the next record
+_STAKE_RECORD_KEYS = frozenset(("node_addr", "pkey_hash", "tx_hash", "stake_value"))
+
+class NetworkStatus:
+    """Parsed `net get status` output."""
+    __slots__ = ("name", "node_address", "our_node_state", "network_state",
+                 "main_status", "block_height", "sync_percentage")
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, None)
+
+    def as_dict(self):
+        """Fields that were present, keyed like parseNetworkStatus always returned them."""
+        return {field: getattr(self, field) for field in self.__slots__[1:] if getattr(self, field) is not None}
+
+class StakeKey:
+    """One record of `srv_stake list keys` output."""
+    __slots__ = ("node_addr", "pkey_hash", "tx_hash", "stake_value", "sovereign_addr", "sovereign_tax")
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, None)
+
+class TxRecord:
+    """One transaction of `tx_history` output, reduced to what reward accounting needs."""
+    __slots__ = ("hash", "created", "accepted", "reward")
 
-    # Initialize default values to ensure keys are always set
-    stake_info['stake_value'] = "0"
-    stake_info['sovereign_addr'] = "N/A"
-    stake_info['sovereign_tax'] = "0"
+    def __init__(self, tx_hash, created, accepted, reward):
+        self.hash = tx_hash
+        self.created = created
+        self.accepted = accepted
+        self.reward = reward
 
-    # Iterate through each line and search for the relevant keys
+class NodeVersion:
+    """Parsed `version` output."""
+    __slots__ = ("version", "raw")
+
+    def __init__(self, version, raw):
+        self.version = version
+        self.raw = raw
+
+def _nested_items(lines):
+    """Yields (section path, key, value) for every "key: value" line, tracking sections by indentation."""
+    stack = []
     for line in lines:
-        if "stake_value:" in line:
-            stake_info['stake_value'] = line.split(":", 1)[1].strip()
-        elif "sovereign_addr:" in line:
-            stake_info['sovereign_addr'] = line.split(":", 1)[1].strip()
-        elif "sovereign_tax:" in line:
-            stake_info['sovereign_tax'] = line.split(":", 1)[1].strip()
+        match = _KEY_VALUE.match(line)
+        if not match:
+            continue
+        indent, key, value = match.groups()
+        depth = len(indent.expandtabs())
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        key = key.strip()
+        if value:
+            yield stack, key, value
+        else:
+            stack.append((depth, key))
 
-    return stake_info
+def parse_net_status(output):
+    """Parses `net get status` in one pass. Field order within sections does not matter."""
+    status = NetworkStatus()
+    main = []
+    for sections, key, value in _nested_items(output.splitlines()):
+        section = sections[-1][1] if sections else ""
+        if key == "current_addr":
+            status.node_address = value
+        elif key == "name" and section in ("", "status"):
+            status.name = value
+        elif value.startswith("NET_STATE") and key == "current":
+            status.our_node_state = value
+        elif value.startswith("NET_STATE") and key == "target":
+            status.network_state = value
+        elif section == "main":
+            main.append((key, value))
+    if main:
+        fields = dict(main)
+        # Older nodes only guarantee the order: status, current, in network, percent
+        positional = [value for _, value in main]
+        status.main_status = fields.get("status", positional[0])
+        status.block_height = fields.get("in network", positional[2] if len(positional) > 2 else None)
+        status.sync_percentage = fields.get("percent", positional[3] if len(positional) > 3 else None)
+    return status
 
-# Fetch rewards for the last 30 days
-def fetch_tx_history(fee_addr):
-    result = subprocess.run([CLI, "tx_history", "-addr", fee_addr], capture_output=True, text=True)
-    return result.stdout
-# Extract block reward transactions
-def get_block_reward_transactions(history):
-    reward_transactions = []
-    lines = history.splitlines()
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if "status: ACCEPTED" in line:  # Check for accepted status
-            transaction_block = []
-            is_reward_transaction = False
-            for j in range(i, i + 35):  # Look within the next 35 lines
-                if j < len(lines):
-                    transaction_block.append(lines[j])
-                    if "source_address: reward collecting" in lines[j]:
-                        is_reward_transaction = True
-            if is_reward_transaction:
-                reward_transactions.append("\n".join(transaction_block))
-        i += 1
-    return reward_transactions
-
-
-# Filter transactions by day
-def filter_transactions_by_day(transactions, day):
-    daily_transactions = []
-    for transaction in transactions:
-        match = re.search(r'tx_created:\s*([\w, :]+)', transaction)
-        if match:
-            tx_date_str = match.group(1).strip()
+def parse_stake_keys(output):
+    """Parses `srv_stake list keys` into one StakeKey per listed key."""
+    keys = []
+    current = None
+    seen = set()
+    for _, key, value in _nested_items(output.splitlines()):
+        if key not in StakeKey.__slots__:
+            continue
+        if current is None or key in seen and key in _STAKE_RECORD_KEYS:
+            current = StakeKey()
+            keys.append(current)
+            seen = set()
+        seen.add(key)
+        setattr(current, key, value)
+    return keys
+
+def parse_version(output):
+    """The version is the last token of `version` output ("cellframe-node version 5.3-360")."""
+    raw = output.strip()
+    return NodeVersion(raw.split()[-1] if raw else None, raw)
+
+# Parse tx_created ("Mon, 14 Oct 2024 12:34:56") without the cost of strptime
+def parse_tx_created(value):
+    match = _TX_CREATED.search(value)
+    if not match:
+        return None
+    day, month, year, hour, minute, second = match.groups()
+    month = _MONTHS.get(month)
+    if month is None:
+        return None
+    try:
+        return datetime(int(year), month, int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
+
+def _tx_record(record, reward):
+    return TxRecord(record.get("hash"), parse_tx_created(record.get("tx_created", "")),
+                    record.get("status") == "ACCEPTED", reward)
+
+def parse_tx_history(lines):
+    """Parses tx_history output in one pass, yielding a TxRecord per transaction.
+
+    Records are split when a once-per-transaction key repeats, so field order inside a
+    transaction does not matter. `reward` sums recv_coins of items sourced from reward collecting.
+    """
+    record = {}
+    reward = 0.0
+    pending_coins = None  # recv_coins of the current item, source not seen yet
+    pending_reward = False  # reward source seen, recv_coins not seen yet
+    for line in lines:
+        match = _TX_FIELD.match(line)
+        if not match:
+            continue
+        key, value = match.groups()
+        if key in _TX_RECORD_KEYS:
+            if key in record:
+                yield _tx_record(record, reward)
+                record = {}
+                reward = 0.0
+                pending_coins = None
+                pending_reward = False
+            record[key] = value
+        elif key == "recv_coins":
             try:
-                tx_date = datetime.strptime(tx_date_str, "%a, %d %b %Y %H:%M:%S").strftime("%a, %d %b %Y")
-                if tx_date == day:
-                    daily_transactions.append(transaction)
-            except ValueError as e:
-                print(f"Error parsing date: {tx_date_str} - {e}")
-    return daily_transactions
-# Filter for reward collecting
-def filter_for_reward_collecting(transactions):
-    reward_transactions = []
-    for transaction in transactions:
-        lines = transaction.splitlines()
-        for i, line in enumerate(lines):
-            if "source_address: reward collecting" in line:
-                reward_transactions.append("\n".join(lines[max(0, i-4):i+4]))
-    return reward_transactions
-# Extract rewards
-def extract_rewards(transactions):
-    total_reward = 0
-    for transaction in transactions:
-        match = re.search(r'recv_coins:\s*([\d.]+)', transaction)
+                coins = float(value)
+            except ValueError:
+                continue
+            if pending_reward:
+                reward += coins
+                pending_reward = False
+            else:
+                pending_coins = coins
+        elif value == "reward collecting":
+            if pending_coins is not None:
+                reward += pending_coins
+                pending_coins = None
+            else:
+                pending_reward = True
+        else:
+            pending_coins = None
+            pending_reward = False
+    if record:
+        yield _tx_record(record, reward)
+
+# -------------- NETWORK CONFIG ----------------
+
+NETWORK_LIST_TTL = 3600  # Seconds `net list` is reused while the network config directory is unchanged
+CONFIG_CHECK_INTERVAL = 30  # Seconds between checks of the network configs for changes
+_CFG_SECTION = re.compile(r'^\[([^\]]+)\]$')
+
+def parse_cfg(text):
+    """Parses a cellframe-node .cfg file into {section: {key: value}}.
+
+    Keys above the first section header are kept under "". The first
+    occurrence of a key in a section wins.
+    """
+    sections = {"": {}}
+    current = sections[""]
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        match = _CFG_SECTION.match(line)
         if match:
-            reward_value = float(match.group(1))
-            total_reward += reward_value
-    return total_reward
+            current = sections.setdefault(match.group(1).strip(), {})
+        elif "=" in line:
+            key, value = line.split("=", 1)
+            current.setdefault(key.strip(), value.strip())
+    return sections
 
+def cfg_value(sections, key, prefer=()):
+    """Value of key from the preferred sections first, then from any section in file order."""
+    for name in (*prefer, *sections):
+        if key in sections.get(name, ()):
+            return sections[name][key]
+    return None
 
-# Calculate rewards for a specific day
-def calculate_rewards_for_day(history, day):
-    block_reward_transactions = get_block_reward_transactions(history)
-    daily_transactions = filter_transactions_by_day(block_reward_transactions, day)
-    reward_transactions = filter_for_reward_collecting(daily_transactions)
-    return extract_rewards(reward_transactions)
-# Calculate rewards for the last 30 days
-def calculate_rewards(fee_addr):
-    history = fetch_tx_history(fee_addr)
+def file_signature(path):
+    """(device, inode, mtime, size) of path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+class ConfigCache:
+    """Parsed .cfg files, reparsed only when their inode, mtime or size changed."""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        """Sections of path, or None if it does not exist."""
+        signature = file_signature(path)
+        with self.lock:
+            if signature is None:
+                self.entries.pop(path, None)
+                return None
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+        with open(path, "r") as f:
+            sections = parse_cfg(f.read())
+        with self.lock:
+            self.entries[path] = (signature, sections)
+        return sections
+
+config_cache = ConfigCache()
+
+def network_config_path(network):
+    return os.path.join(NETWORK_CONFIG_DIR, f"{network}.cfg")
+
+def config_dir_signature():
+    """{cfg file name: signature} of the network config directory."""
+    try:
+        with os.scandir(NETWORK_CONFIG_DIR) as entries:
+            names = [entry.name for entry in entries if entry.name.endswith(".cfg")]
+    except FileNotFoundError:
+        return {}
+    return {name: file_signature(os.path.join(NETWORK_CONFIG_DIR, name)) for name in names}
+
+# (config dir signature, time, networks) of the last successful `net list`
+_network_list = None
+# Config dir signature as last seen by watchNetworkConfigs
+_watched_configs = None
+
+def watchNetworkConfigs():
+    """Re-collects right away when a network config was added, removed or edited."""
+    global _watched_configs
+    signature = config_dir_signature()
+    previous, _watched_configs = _watched_configs, signature
+    if previous is None or previous == signature:
+        return
+    if previous.keys() != signature.keys():
+        print("Network configs added or removed, refreshing all networks")
+        if scheduler is not None:
+            scheduler.trigger("status")
+            scheduler.trigger("stake")
+        return
+    for name in sorted(name for name in signature if signature[name] != previous[name]):
+        network = name[:-len(".cfg")]
+        if network not in getNetworkNames():
+            continue
+        print(f"Config of network {network} changed, re-collecting it")
+        _rewards_marks.pop(network, None)
+        collectNetworkStake(network)
+    if scheduler is not None:
+        scheduler.trigger("rewards")
+
+# -------------- CHAIN STORAGE ----------------
+
+CHAIN_READER_ENABLED = False  # Count atoms in the local chain files, without the CLI
+CHAIN_POLL_INTERVAL = 5  # Seconds between polls of the chain files
+CHAIN_RATE_WINDOW = 300  # Seconds of polls the growth rates are computed over
+# Cell files start with a packed dap_chain_cell_file_header_t, then hold (uint64 size, atom) pairs
+CHAIN_CELL_SIGNATURE = 0xfa340bef153eba48
+CHAIN_CELL_HEADER = struct.Struct("<QIBQQQ")
+_CHAIN_ATOM_SIZE = struct.Struct("<Q")
+
+class ChainCellFile:
+    """Atom count of one .dchaincell file, advanced over the appended tail on every poll."""
+
+    def __init__(self, path):
+        self.path = path
+        self.reset(None)
+
+    def reset(self, inode):
+        self.inode = inode
+        self.offset = 0  # End of the last complete atom
+        self.atoms = 0
+        self.valid = True
+
+    def poll(self):
+        """Counts the atoms appended since the last poll. Returns the number of new atoms."""
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            self.reset(None)
+            return 0
+        try:
+            st = os.fstat(fd)
+            if st.st_ino != self.inode or st.st_size < self.offset:
+                self.reset(st.st_ino)  # Replaced or truncated, e.g. by a resync
+            if not self.valid or st.st_size <= self.offset:
+                return 0
+            # Map only the tail, starting on the page boundary at or below the last offset
+            start = self.offset - self.offset % mmap.ALLOCATIONGRANULARITY
+            with mmap.mmap(fd, st.st_size - start, access=mmap.ACCESS_READ, offset=start) as mapped:
+                return self._scan(memoryview(mapped), start, st.st_size)
+        finally:
+            os.close(fd)
+
+    def _scan(self, view, base, size):
+        try:
+            position = self.offset
+            if position == 0:
+                if size < CHAIN_CELL_HEADER.size:
+                    return 0
+                if CHAIN_CELL_HEADER.unpack_from(view, 0)[0] != CHAIN_CELL_SIGNATURE:
+                    print(f"Unknown chain file format: {self.path}")
+                    self.valid = False
+                    return 0
+                position = CHAIN_CELL_HEADER.size
+            added = 0
+            while position + _CHAIN_ATOM_SIZE.size <= size:
+                atom_size = _CHAIN_ATOM_SIZE.unpack_from(view, position - base)[0]
+                end = position + _CHAIN_ATOM_SIZE.size + atom_size
+                if end > size:
+                    break  # Atom still being written
+                position = end
+                added += 1
+            self.offset = position
+            self.atoms += added
+            return added
+        finally:
+            view.release()
+
+class ChainStorageReader:
+    """Local atom counts and growth rates of every chain of every network.
+
+    Chains and their storage_dir come from NETWORK_CONFIG_DIR/<net>/*.cfg;
+    a relative storage_dir is resolved against the cfg's directory.
+    """
+
+    def __init__(self):
+        self.cells = {}  # path -> ChainCellFile
+        self.samples = {}  # (network, chain) -> deque of (time, atoms, bytes)
+        self.lock = threading.Lock()
+
+    def chains(self, network):
+        """{chain name: storage directory} of a network."""
+        chain_dir = os.path.join(NETWORK_CONFIG_DIR, network)
+        try:
+            names = sorted(name for name in os.listdir(chain_dir) if name.endswith(".cfg"))
+        except FileNotFoundError:
+            return {}
+        chains = {}
+        for name in names:
+            sections = config_cache.get(os.path.join(chain_dir, name))
+            storage_dir = sections and cfg_value(sections, "storage_dir", prefer=("files",))
+            if storage_dir:
+                chain = cfg_value(sections, "name", prefer=("chain",)) or name[:-len(".cfg")]
+                chains[chain] = os.path.normpath(os.path.join(chain_dir, storage_dir))
+        return chains
+
+    def poll(self, networks, now=None):
+        """{network: {chain: stats}} after reading what was appended to each chain's cell files."""
+        now = time.monotonic() if now is None else now
+        result = {}
+        with self.lock:
+            for network in networks:
+                for chain, storage_dir in self.chains(network).items():
+                    try:
+                        paths = sorted(os.path.join(storage_dir, name) for name in os.listdir(storage_dir)
+                                       if name.endswith(".dchaincell"))
+                    except FileNotFoundError:
+                        continue
+                    atoms = 0
+                    size = 0
+                    for path in paths:
+                        cell = self.cells.get(path)
+                        if cell is None:
+                            cell = self.cells[path] = ChainCellFile(path)
+                        cell.poll()
+                        atoms += cell.atoms
+                        size += cell.offset
+                    result.setdefault(network, {})[chain] = self._stats((network, chain), now, atoms, size)
+        return result
+
+    def _stats(self, key, now, atoms, size):
+        samples = self.samples.setdefault(key, deque())
+        samples.append((now, atoms, size))
+        while len(samples) > 2 and now - samples[1][0] >= CHAIN_RATE_WINDOW:
+            samples.popleft()
+        first = samples[0]
+        elapsed = now - first[0]
+        return {
+            "atoms": atoms,
+            "bytes": size,
+            "atoms_per_s": round((atoms - first[1]) / elapsed, 4) if elapsed > 0 else 0.0,
+            "bytes_per_s": round((size - first[2]) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+chain_reader = ChainStorageReader()
+
+# Poll the local chain files of every network into live_data['local_chains']
+def sampleChainStorage():
+    try:
+        local_chains = chain_reader.poll(getNetworkNames())
+    except (OSError, ValueError) as e:
+        print(f"Error reading chain storage: {e}")
+        return None
+    with _live_lock:
+        live_data['local_chains'] = local_chains
+    return local_chains
+
+# -------------- REWARDS ----------------
+
+# Days covered by the reward buckets
+REWARD_WINDOW_DAYS = 30
+# The deposit behind a stake is the stake value times this, the basis of every APY
+DEPOSIT_MULTIPLIER = 1000
+# Stream tx_history output line by line straight from the CLI pipe
+def stream_tx_history(fee_addr, net=None):
+    import subprocess
+    args = ["tx_history", "-addr", fee_addr, *(["-net", net] if net else [])]
+    timeout = cli_timeout(args)
+    if not cli_breaker.allow():
+        raise CliUnavailable("CLI circuit open")
+    deadline = time.monotonic() + timeout
+    # Waiting for the slot counts against the deadline
+    timeout = _acquire_cli_slot(deadline)
+    try:
+        started = time.perf_counter()
+        received = 0
+        retries = 0
+        returncode = None
+        try:
+            pool = get_cli_socket_pool()
+            if pool is not None:
+                streamed = False
+                try:
+                    for line in pool.stream(args, timeout):
+                        streamed = True
+                        received += len(line)
+                        if time.monotonic() > deadline:
+                            raise socket.timeout()
+                        yield line
+                    returncode = 0
+                    cli_breaker.success()
+                    return
+                except socket.timeout:
+                    cli_breaker.failure()
+                    raise CliTimeout(f"tx_history timed out after {timeout:.0f}s")
+                except (OSError, CliSocketError) as e:
+                    # Once output went out, falling back would repeat it
+                    if streamed:
+                        raise
+                    disable_cli_socket(e)
+                    retries += 1
+            proc = subprocess.Popen(
+                [CLI, *args],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                start_new_session=True
+            )
+            # Kills the whole process group once the deadline passes, ending the read loop below
+            watchdog = threading.Timer(max(0.0, deadline - time.monotonic()), _kill_process_group, (proc,))
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                for line in proc.stdout:
+                    received += len(line)
+                    yield line
+            finally:
+                watchdog.cancel()
+                # Closing the generator early (window reached) must not leave the CLI running
+                proc.stdout.close()
+                if proc.poll() is None:
+                    _kill_process_group(proc)
+                returncode = proc.wait()
+            if time.monotonic() > deadline and returncode < 0:
+                cli_breaker.failure()
+                raise CliTimeout(f"tx_history timed out after {timeout:.0f}s")
+            cli_breaker.success()
+        except GeneratorExit:
+            # The caller stopped reading (window reached): the command answered, killing it was ours
+            returncode = 0
+            cli_breaker.success()
+            raise
+        finally:
+            record_cli(args, time.perf_counter() - started, returncode, received, retries)
+    finally:
+        _cli_slots.release()
+# -------------- REWARD LEDGER ----------------
+
+# Per fee address ledger of reward transactions, so each cycle only parses what is new
+LEDGER_PATH = os.path.join(PLUGIN_PATH, "ledger")
+# Days of per-day totals kept in the ledger; older transactions are pruned
+LEDGER_RETENTION_DAYS = 400
+
+def _ledger_file(fee_addr):
+    return os.path.join(LEDGER_PATH, f"{fee_addr}.json")
+
+def _empty_ledger(fee_addr):
+    return {"fee_addr": fee_addr, "checkpoint": None, "txs": {}, "days": {}}
+
+def load_reward_ledger(fee_addr):
+    """Loads the ledger of a fee address, or an empty one if missing or unreadable."""
+    try:
+        with open(_ledger_file(fee_addr), 'r') as f:
+            ledger = json.load(f)
+        if ledger.get("fee_addr") == fee_addr:
+            return ledger
+        print(f"Ledger for {fee_addr} belongs to another address, starting over.")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Error reading ledger for {fee_addr}: {e}")
+    return _empty_ledger(fee_addr)
+
+def save_reward_ledger(ledger):
+    """Writes the ledger atomically so a crash never leaves a torn file behind."""
+    os.makedirs(LEDGER_PATH, exist_ok=True)
+    path = _ledger_file(ledger["fee_addr"])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(ledger, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def update_reward_ledger(ledger, lines, now=None):
+    """Adds reward transactions past the ledger checkpoint. Returns the number of new transactions."""
+    cutoff = (now or datetime.now()).date() - timedelta(days=LEDGER_RETENTION_DAYS)
+    txs = ledger["txs"]
+    days = ledger["days"]
+    checkpoint = ledger["checkpoint"]
+    newest = None
+    if checkpoint:
+        newest = (parse_tx_created(checkpoint["tx_created"]), checkpoint["hash"])
+    checkpoint_seen = False
+    previous = None
+    descending = True
+    added = 0
+    for tx in parse_tx_history(lines):
+        tx_hash = tx.hash
+        created = tx.created
+        if created is None:
+            continue
+        if previous is not None and created > previous:
+            descending = False
+        # Newest-first history: everything past the checkpoint was processed on an earlier run
+        if checkpoint_seen and descending:
+            break
+        if created.date() < cutoff:
+            if descending and previous is not None:
+                break
+            previous = created
+            continue
+        previous = created
+        if checkpoint and tx_hash == checkpoint["hash"]:
+            checkpoint_seen = True
+            continue
+        if tx_hash and (newest is None or newest[0] is None or created > newest[0]):
+            newest = (created, tx_hash)
+        if not tx.accepted or not tx.reward or not tx_hash or tx_hash in txs:
+            continue
+        day = created.date().isoformat()
+        txs[tx_hash] = [day, tx.reward]
+        days[day] = days.get(day, 0.0) + tx.reward
+        added += 1
+    if newest is not None and newest[0] is not None:
+        ledger["checkpoint"] = {"hash": newest[1], "tx_created": newest[0].strftime("%a, %d %b %Y %H:%M:%S")}
+    # Prune transactions and totals that fell out of the retention window
+    cutoff_iso = cutoff.isoformat()
+    for tx_hash in [h for h, (day, _) in txs.items() if day < cutoff_iso]:
+        del txs[tx_hash]
+    for day in [d for d in days if d < cutoff_iso]:
+        del days[day]
+    return added
+
+def ledger_rewards(ledger, days=REWARD_WINDOW_DAYS, now=None):
+    """Per-day rewards for the last `days` days, newest first, keyed like calculate_rewards."""
+    today = (now or datetime.now()).date()
+    totals = ledger["days"]
     rewards = {}
-    for i in range(30):
-        day = (datetime.now() - timedelta(days=i)).strftime("%a, %d %b %Y")
-        rewards[day] = calculate_rewards_for_day(history, day)
+    for i in range(days):
+        day = today - timedelta(days=i)
+        rewards[day.strftime("%a, %d %b %Y")] = totals.get(day.isoformat(), 0.0)
     return rewards
 
+def sync_reward_ledger(fee_addr, net=None):
+    """Brings the ledger of a fee address up to date with the chain and stores it."""
+    ledger = load_reward_ledger(fee_addr)
+    history = stream_tx_history(fee_addr, net)
+    try:
+        added = update_reward_ledger(ledger, history)
+    finally:
+        history.close()
+    save_reward_ledger(ledger)
+    print(f"Ledger for {fee_addr}: {added} new reward transactions")
+    return ledger
+
+def rebuild_reward_ledger(fee_addr):
+    """Discards the stored ledger and rebuilds it from the full transaction history."""
+    ledger = _empty_ledger(fee_addr)
+    history = stream_tx_history(fee_addr)
+    try:
+        added = update_reward_ledger(ledger, history)
+    finally:
+        history.close()
+    save_reward_ledger(ledger)
+    print(f"Ledger for {fee_addr} rebuilt with {added} reward transactions")
+    return ledger
+
+def verify_reward_ledger(fee_addr):
+    """Compares the stored per-day totals against a fresh scan. Returns the mismatching days."""
+    stored = load_reward_ledger(fee_addr)
+    fresh = _empty_ledger(fee_addr)
+    history = stream_tx_history(fee_addr)
+    try:
+        update_reward_ledger(fresh, history)
+    finally:
+        history.close()
+    mismatches = {}
+    for day in sorted(set(stored["days"]) | set(fresh["days"])):
+        stored_value = stored["days"].get(day, 0.0)
+        fresh_value = fresh["days"].get(day, 0.0)
+        if abs(stored_value - fresh_value) > 1e-9:
+            mismatches[day] = (stored_value, fresh_value)
+    if mismatches:
+        print(f"Ledger for {fee_addr} is out of sync on {len(mismatches)} days, run a rebuild.")
+    else:
+        print(f"Ledger for {fee_addr} matches the chain.")
+    return mismatches
+
+# -------------- TX HISTORY SYNCS ----------------
+
+class TxHistorySyncs:
+    """Reward ledger syncs keyed by (fee address, net).
+
+    Concurrent requests for the same key share one tx_history fetch, so a fee
+    address configured for several networks is fetched once per rewards round.
+    When to sync is decided by the caller (see collectNetworkRewards).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inflight = {}  # (fee_addr, net) -> Future of the running fetch
+        self.fetched = 0
+        self.coalesced = 0
+
+    def ledger(self, fee_addr, net=None):
+        """Ledger of fee_addr synced with the chain, sharing a sync already running for the same key."""
+        key = (fee_addr, net)
+        with self.lock:
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self.inflight[key] = Future()
+                self.fetched += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+        try:
+            ledger = sync_reward_ledger(fee_addr, net)
+        except BaseException as e:
+            with self.lock:
+                del self.inflight[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            del self.inflight[key]
+        future.set_result(ledger)
+        return ledger
+
+    def stats(self):
+        with self.lock:
+            return {"fetched": self.fetched, "coalesced": self.coalesced}
+
+tx_history_syncs = TxHistorySyncs()
+
+# -------------- TIME SERIES ----------------
+
+# Per network sample files of rewards, block height, sync percentage and stake.
+# None puts them in PLUGIN_PATH/timeseries, resolved when a store is opened
+TIMESERIES_PATH = None
+# Moving average windows in days kept as running sums
+TS_WINDOWS = (7, 30, 90, 365)
+# Days kept at daily resolution; older days are downsampled to weekly records
+TS_DAILY_DAYS = 365
+# Days kept at all; anything older is dropped on compaction
+TS_MAX_DAYS = 5 * 365
+# Compact the file once it holds this many records (about 650 KB)
+TS_COMPACT_RECORDS = 20000
+
+class TimeSeriesStore:
+    """File of fixed-size samples with running window sums over daily rewards.
+
+    Record: day ordinal, resolution in days, rewards, block height, sync percentage, stake.
+    The last record of a day wins. A new day is an append, later updates of the same day
+    overwrite its record in place, so the file grows by one record per day. Moving averages
+    are kept as running sums per window and come out in constant time.
+    """
+    RECORD = struct.Struct("<IBdQfd")
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.days = {}  # day ordinal -> [rewards, block_height, sync, stake, resolution]
+        self.offsets = {}  # day ordinal -> file offset of the day's last record
+        self.records = 0
+        self.today = datetime.now().date().toordinal()
+        self.sums = dict.fromkeys(TS_WINDOWS, 0.0)
+        self._load()
+
+    def _load(self):
+        self.days = {}
+        self.offsets = {}
+        self.records = 0
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        usable = len(data) - len(data) % self.RECORD.size
+        if usable < len(data):
+            # A torn last record from an interrupted write: cut it off so appends stay aligned
+            with open(self.path, 'r+b') as f:
+                f.truncate(usable)
+        records = self.RECORD.iter_unpack(memoryview(data)[:usable])
+        for i, (day, resolution, rewards, height, sync, stake) in enumerate(records):
+            self.days[day] = [rewards, height, sync, stake, resolution]
+            self.offsets[day] = i * self.RECORD.size
+            self.records += 1
+        self.sums = {
+            window: sum(self.days[day][0] for day in range(self.today - window + 1, self.today + 1) if day in self.days)
+            for window in TS_WINDOWS
+        }
+
+    def _advance(self, today):
+        """Moves the windows forward to `today`, dropping the days that left each window."""
+        while self.today < today:
+            self.today += 1
+            for window in TS_WINDOWS:
+                leaving = self.days.get(self.today - window)
+                if leaving is not None:
+                    self.sums[window] -= leaving[0]
+                entering = self.days.get(self.today)
+                if entering is not None:
+                    self.sums[window] += entering[0]
+
+    def _write(self, day, entry):
+        record = self.RECORD.pack(day, entry[4], entry[0], entry[1], entry[2], entry[3])
+        offset = self.offsets.get(day)
+        if offset is not None:
+            with open(self.path, 'r+b') as f:
+                f.seek(offset)
+                f.write(record)
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'ab') as f:
+            self.offsets[day] = f.seek(0, os.SEEK_END)
+            f.write(record)
+        self.records += 1
+
+    def _set(self, day, rewards=None, block_height=None, sync=None, stake=None):
+        entry = self.days.get(day)
+        if entry is None:
+            # Carry the last known status forward into a new day
+            last = self.days[max(self.days)] if self.days else [0.0, 0, 0.0, 0.0, 1]
+            entry = self.days[day] = [0.0, last[1], last[2], last[3], 1]
+        if rewards is not None:
+            delta = rewards - entry[0]
+            entry[0] = rewards
+            for window in TS_WINDOWS:
+                if self.today - window < day <= self.today:
+                    self.sums[window] += delta
+        if block_height is not None:
+            entry[1] = block_height
+        if sync is not None:
+            entry[2] = sync
+        if stake is not None:
+            entry[3] = stake
+        self._write(day, entry)
+
+    def sample(self, block_height=None, sync=None, stake=None, now=None):
+        """Stores a status sample for today."""
+        today = (now or datetime.now()).date().toordinal()
+        with self.lock:
+            self._advance(today)
+            self._set(today, block_height=block_height, sync=sync, stake=stake)
+            if self.records > TS_COMPACT_RECORDS:
+                self._compact()
+
+    def sync_rewards(self, daily_rewards, now=None):
+        """Stores per-day reward totals ({"YYYY-MM-DD": total}) that differ from what is stored."""
+        today = (now or datetime.now()).date().toordinal()
+        with self.lock:
+            self._advance(today)
+            for day_iso, total in daily_rewards.items():
+                day = date.fromisoformat(day_iso).toordinal()
+                entry = self.days.get(day)
+                if day > today - TS_DAILY_DAYS and (entry is None or entry[0] != total):
+                    self._set(day, rewards=total)
+
+    def moving_average(self, window, now=None):
+        """Average daily rewards over the last `window` days including today."""
+        with self.lock:
+            self._advance((now or datetime.now()).date().toordinal())
+            return self.sums[window] / window
+
+    def _compact(self):
+        """Rewrites the file with one record per day, weekly records past TS_DAILY_DAYS."""
+        daily_from = self.today - TS_DAILY_DAYS + 1
+        keep_from = self.today - TS_MAX_DAYS + 1
+        compacted = {}
+        for day in sorted(self.days):
+            entry = self.days[day]
+            if day < keep_from:
+                continue
+            if day >= daily_from:
+                compacted[day] = entry
+                continue
+            week = day - (day - keep_from) % 7
+            weekly = compacted.get(week)
+            if weekly is None:
+                compacted[week] = [entry[0], entry[1], entry[2], entry[3], 7]
+            else:
+                weekly[0] += entry[0]
+                weekly[1:4] = entry[1:4]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for day, entry in compacted.items():
+                f.write(self.RECORD.pack(day, entry[4], entry[0], entry[1], entry[2], entry[3]))
+        os.replace(tmp_path, self.path)
+        self._load()
+
+_timeseries = {}  # file path -> TimeSeriesStore
+_timeseries_lock = threading.Lock()
+
+def get_timeseries(network):
+    path = os.path.join(TIMESERIES_PATH or os.path.join(PLUGIN_PATH, "timeseries"), f"{network}.ts")
+    with _timeseries_lock:
+        store = _timeseries.get(path)
+        if store is None:
+            store = _timeseries[path] = TimeSeriesStore(path)
+        return store
+
+def timeseries_apy(store, stake_value, sovereign_tax, windows=TS_WINDOWS):
+    """{"ma<N>": {"value", "apy"}} from the running sums, adjusted like calculate_moving_averages."""
+    total_income_multiplier = 1 / (1 - float(sovereign_tax) / 100)
+    deposited_amount = float(stake_value) * DEPOSIT_MULTIPLIER
+    averages = {}
+    for window in windows:
+        ma = store.moving_average(window) * total_income_multiplier
+        averages[f"ma{window}"] = {
+            "value": ma,
+            "apy": (ma * 365 / deposited_amount) * 100 if deposited_amount > 0 else 0
+        }
+    return averages
+
+# -------------- COLLECTION ----------------
+
+# Calculate rewards for the last 30 days
+def calculate_rewards(fee_addr):
+    with stage("rewards"):
+        return ledger_rewards(tx_history_syncs.ledger(fee_addr))
+
 # Calculate moving averages (MA7 and MA30)
 def calculate_moving_averages(rewards, stake_value, sovereign_tax):
     # Convert the sovereign_tax percentage to a decimal
@@ -278,8 +1160,8 @@ def calculate_moving_averages(rewards, stake_value, sovereign_tax):
     # Calculate MA30 (for the last 30 days)
     ma30 = sum(reward_values[:30]) / 30 if len(reward_values) >= 30 else 0
 
-    # Deposited amount is the stake value multiplied by 1000
-    deposited_amount = stake_value * 1000
+    # Deposited amount is the stake value multiplied by DEPOSIT_MULTIPLIER
+    deposited_amount = stake_value * DEPOSIT_MULTIPLIER
 
     # Calculate APY based on MA7 and MA30
     ma7_apy = (ma7 * 365 / deposited_amount) * 100 if deposited_amount > 0 else 0
@@ -288,93 +1170,70 @@ def calculate_moving_averages(rewards, stake_value, sovereign_tax):
     return ma7, ma30, ma7_apy, ma30_apy, adjusted_rewards
 
 
-def collectAllData():
-    collected_data = {
-        "networks": {}
+# Build the fee_addr_info entry from rewards and stake info
+def buildFeeAddrInfo(fee_addr, rewards, stake_info):
+    ma7, ma30, ma7_apy, ma30_apy, adjusted_rewards = calculate_moving_averages(
+        rewards, float(stake_info['stake_value']), stake_info['sovereign_tax']
+    )
+    return {
+        "fee_addr": fee_addr,
+        "ma7": {
+            "date": datetime.now().strftime("%a, %d %b %Y"),
+            "value": ma7,
+            "apy": ma7_apy
+        },
+        "ma30": {
+            "date": datetime.now().strftime("%a, %d %b %Y"),
+            "value": ma30,
+            "apy": ma30_apy
+        },
+        "rewards": adjusted_rewards
     }
-    # Collect system information
-    collected_data['hostname'] = cached_data['hostname']
-    collected_data['service_uptime'] = getServiceUptime()
-    collected_data['node_version'] = getNodeVersion()
-    collected_data['timestamp'] = time.strftime("%Y-%m-%d %H:%M:%S")
 
-    # Fetch all network data
-    networks = getNetworkNames()
-    if isinstance(networks, list):
-        for network in networks:
-            print(f"Processing network: {network}")
-            network_status = getNetworkStatus(network)
-            # Read network config and fetch rewards
-            network_config = readNetworkConfig(network)
-
-            if isinstance(network_config, dict):
-                blocks_sign_cert = network_config.get('blocks_sign_cert')
-                if not blocks_sign_cert:
-                    print(f"Warning: No blocks-sign-cert found for network {network}. Skipping this network.")
-                    continue  # Skip this network
-
-                # Process stake information
-                stake_info = getStakeInfo(network, blocks_sign_cert)
-                if isinstance(stake_info, dict):
-                    # Include stake value and sovereign address/tax if available
-                    collected_data['networks'][network] = network_status
-                    collected_data['networks'][network].update(stake_info)
-
-                    if 'sovereign_addr' in stake_info and 'sovereign_tax' in stake_info:
-                        collected_data['networks'][network]['sovereign_addr_info'] = {
-                            "sovereign_addr": stake_info['sovereign_addr'],
-                            "sovereign_tax": stake_info['sovereign_tax']
-                        }
-                    else:
-                        print(f"No sovereign_addr_info found for network {network}")
-                        collected_data['networks'][network]['sovereign_addr_info'] = None
-
-                # Check fee address and rewards
-                fee_addr = network_config.get('fee_addr')
-                if fee_addr:
-                    # Calculate rewards and adjusted values
-                    rewards = calculate_rewards(fee_addr)
-                    ma7, ma30, ma7_apy, ma30_apy, adjusted_rewards = calculate_moving_averages(
-                        rewards, float(stake_info['stake_value']), stake_info['sovereign_tax']
-                    )
-
-                    # Write adjusted values to the collected data
-                    collected_data['networks'][network]['fee_addr_info'] = {
-                        "fee_addr": fee_addr,
-                        "ma7": {
-                            "date": datetime.now().strftime("%a, %d %b %Y"),
-                            "value": ma7,
-                            "apy": ma7_apy
-                        },
-                        "ma30": {
-                            "date": datetime.now().strftime("%a, %d %b %Y"),
-                            "value": ma30,
-                            "apy": ma30_apy
-                        },
-                        "rewards": adjusted_rewards
-                    }
-                else:
-                    print(f"Warning: No fee_addr found for network {network}")
-                    collected_data['networks'][network]['fee_addr_info'] = None
-            else:
-                print(f"Warning: No config found for network {network}")
-                continue  # Skip this network as well if no config is found
-    else:
-        print("No networks found.")
 
-    # Ensure node address is available
-    if cached_data['our_node_address']:
-        print(f"Using node address: {cached_data['our_node_address']}")
-        collected_data['node_addr'] = cached_data['our_node_address']
-    else:
-        collected_data['node_addr'] = "Node address not available"
-        print("Warning: Node address could not be detected.")
+# (network, field group) -> [epoch of the last success or None, whether the last attempt succeeded].
+# A failed query leaves the previous values in live_data; its group is listed as stale.
+_field_state = {}
+_field_lock = threading.Lock()
 
-    return collected_data
+def record_fields(network, group):
+    with _field_lock:
+        _field_state[(network, group)] = [int(time.time()), True]
 
+def mark_fields_stale(network, group):
+    with _field_lock:
+        _field_state.setdefault((network, group), [None, False])[1] = False
 
-def generateFinalOutput():
-    collected_data = collectAllData()
+# Last success per field group of a network, and the groups whose latest collection failed
+def field_freshness(network):
+    with _field_lock:
+        states = {group: state for (net, group), state in _field_state.items() if net == network}
+    return {
+        "updated": {group: state[0] for group, state in sorted(states.items())},
+        "stale": sorted(group for group, state in states.items() if not state[1])
+    }
+
+# Run fn(network) for every network on a bounded pool; run_cli caps how many CLI processes exist at once
+def forEachNetwork(fn, networks):
+    with ThreadPoolExecutor(max_workers=COLLECT_WORKERS) as pool:
+        futures = {network: submit_with_budget(pool, fn, network) for network in networks}
+        return {network: future.result() for network, future in futures.items()}
+
+# One full collection, running the same jobs as the scheduler: status and stake side by side, then rewards
+def collectAllData():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        jobs = [submit_with_budget(pool, collectStatus), submit_with_budget(pool, collectStake),
+                pool.submit(sampleNodeResources)]
+        if CHAIN_READER_ENABLED:
+            jobs.append(pool.submit(sampleChainStorage))
+        for job in jobs:
+            job.result()
+    collectRewards()
+    return liveCollectedData()
+
+
+# Shape collected data into the published snapshot
+def buildFinalOutput(collected_data):
     final_data = {
         "node_addr": collected_data['node_addr'],
         "hostname": collected_data['hostname'],
@@ -390,86 +1249,1763 @@ def generateFinalOutput():
                 "block_height": collected_data['networks'][network].get("block_height"),
                 "stake_value": collected_data['networks'][network].get("stake_value"),
                 "sovereign_addr_info": collected_data['networks'][network].get("sovereign_addr_info"),
-                "fee_addr_info": collected_data['networks'][network].get("fee_addr_info")
+                "fee_addr_info": collected_data['networks'][network].get("fee_addr_info"),
+                **field_freshness(network)
             } for network in collected_data['networks']
-        }
+        },
+        "cli_circuit": cli_breaker.state
     }
-    # Write to output.json
-    with open("/opt/cellframe-node/var/lib/plugins/hub/output.json", "w") as f:
-        json.dump(final_data, f, indent=4)
+    if collected_data.get('node_resources'):
+        final_data["node_resources"] = collected_data['node_resources']
+    if collected_data.get('local_chains'):
+        final_data["local_chains"] = collected_data['local_chains']
+    if METRICS_ENABLED:
+        final_data["collector_metrics"] = metrics_snapshot()
+        final_data["tx_history_syncs"] = tx_history_syncs.stats()
+    return final_data
+# Write the snapshot to output.json; readers never see a partially written file
+def writeFinalOutput(final_data):
+    tmp_path = OUTPUT_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(final_data, f, separators=(',', ':'))
+    os.replace(tmp_path, OUTPUT_FILE)
     print("Normal output saved to output.json")
+# Collect everything and publish the snapshot to the sinks
+def generateFinalOutput():
+    with stage("collect"):
+        collected_data = collectAllData()
+    final_data = buildFinalOutput(collected_data)
+    with stage("publish"):
+        publish_snapshot(final_data)
+    return final_data
+# Our node address as published, or a placeholder until a status reported it
+def currentNodeAddr():
+    if cached_data['our_node_address']:
+        return cached_data['our_node_address']
+    print("Warning: Node address could not be detected.")
+    return "Node address not available"
+
+# -------------- SCHEDULED JOBS ----------------
+
+# Job intervals in seconds
+STATUS_INTERVAL = 60  # sync state and block height
+STAKE_INTERVAL = 3600  # stake, sovereign info and node version
+REWARDS_CHECK_INTERVAL = 300  # rewards are recomputed when the day changed or REWARDS_MIN_INTERVAL passed
+REWARDS_MIN_INTERVAL = 1800  # tx_history of a network is fetched at most this often within a day
+PUBLISH_INTERVAL = 300  # publish sinks when something changed; GDB only every SINK_GDB_INTERVAL
+UPDATE_INTERVAL = 86400  # plugin updater
+STARTUP_DELAY = 30  # Seconds of node uptime before the first collection
+STARTUP_STAGGER = 30  # First runs of the jobs are spread over this many seconds after the delay
+UPDATE_FIRST_DELAY = 900  # The first update check waits longer still
+
+# Latest data, updated piecewise by the jobs; same layout as collectAllData's result
+live_data = {
+    "networks": {},
+    "hostname": None,  # Filled in by the first status job
+    "service_uptime": None,
+    "node_version": None,
+    "timestamp": None
+}
+_live_lock = threading.Lock()
+_live_dirty = False
+# Network configs of the networks with a signing cert, refreshed by the stake job
+network_configs = {}
+# (day, newest ledger transaction, stake info) the rewards of each network were last built from
+_rewards_marks = {}
+# Monotonic time of the last tx_history sync of each network
+_rewards_synced = {}
+
+def _mark_live_dirty():
+    global _live_dirty
+    _live_dirty = True
+
+# Sync state and block height of every network
+def collectStatus():
+    networks = getNetworkNames()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        uptime_future = pool.submit(getServiceUptime)
+        statuses = forEachNetwork(getNetworkStatus, networks)
+        uptime = uptime_future.result()
+    with _live_lock:
+        live_data['hostname'] = getHostname()
+        live_data['service_uptime'] = uptime
+        live_data['timestamp'] = time.strftime("%Y-%m-%d %H:%M:%S")
+        if networks:
+            for network in [n for n in live_data['networks'] if n not in statuses]:
+                del live_data['networks'][network]
+        for network, status in statuses.items():
+            if isinstance(status, dict):
+                live_data['networks'].setdefault(network, {}).update(status)
+                record_fields(network, "status")
+            else:
+                print(f"Warning: {status}")
+                mark_fields_stale(network, "status")  # Previous values stay
+        _mark_live_dirty()
+    for network, status in statuses.items():
+        if isinstance(status, dict) and status.get('block_height'):
+            try:
+                get_timeseries(network).sample(
+                    block_height=int(status['block_height']),
+                    sync=_to_float(status.get('sync_percentage')) or 0.0)
+            except (OSError, ValueError) as e:
+                print(f"Error recording status sample for {network}: {e}")
+
+# Stake and sovereign info of every network, plus the node version
+def collectStake():
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        version_future = submit_with_budget(pool, getNodeVersion)
+        forEachNetwork(collectNetworkStake, getNetworkNames())
+        version = version_future.result()
+    with _live_lock:
+        live_data['node_version'] = version
+    if scheduler is not None:
+        scheduler.trigger("rewards")
+
+# Stake and sovereign info of one network
+def collectNetworkStake(network):
+    network_config = readNetworkConfig(network)
+    if not isinstance(network_config, dict) or not network_config.get('blocks_sign_cert'):
+        print(f"Warning: No config or blocks-sign-cert for network {network}. Skipping this network.")
+        network_configs.pop(network, None)
+        return
+    stake_info = getStakeInfo(network, network_config['blocks_sign_cert'])
+    if not isinstance(stake_info, dict):
+        print(f"Warning: No stake info for network {network}: {stake_info}")
+        mark_fields_stale(network, "stake")
+        return
+    network_configs[network] = network_config
+    record_fields(network, "stake")
+    try:
+        get_timeseries(network).sample(stake=_to_float(stake_info['stake_value']) or 0.0)
+    except OSError as e:
+        print(f"Error recording stake sample for {network}: {e}")
+    with _live_lock:
+        entry = live_data['networks'].setdefault(network, {})
+        entry.update(stake_info)
+        entry['sovereign_addr_info'] = {
+            "sovereign_addr": stake_info['sovereign_addr'],
+            "sovereign_tax": stake_info['sovereign_tax']
+        }
+        _mark_live_dirty()
+
+# Rewards of every network whose day or block height changed since the last computation
+def collectRewards():
+    today = datetime.now().date()
+    forEachNetwork(lambda network: collectNetworkRewards(network, today), list(network_configs))
+    if scheduler is not None:
+        scheduler.trigger("publish")
+
+# Rewards of one network: the ledger is synced on a new day or once REWARDS_MIN_INTERVAL passed,
+# and the published values are rebuilt only when that brought new transactions or the stake changed
+def collectNetworkRewards(network, today):
+    network_config = network_configs.get(network)
+    with _live_lock:
+        entry = live_data['networks'].get(network)
+        if network_config is None or entry is None or 'stake_value' not in entry:
+            return
+        stake_info = {key: entry[key] for key in ('stake_value', 'sovereign_addr', 'sovereign_tax')}
+    fee_addr = network_config.get('fee_addr')
+    if not fee_addr:
+        print(f"Warning: No fee_addr found for network {network}")
+        with _live_lock:
+            entry['fee_addr_info'] = None
+        return
+    last = _rewards_marks.get(network)
+    if last is not None and last[0] == today and \
+            time.monotonic() - _rewards_synced.get(network, 0) < REWARDS_MIN_INTERVAL:
+        return
+    try:
+        with stage("rewards"):
+            ledger = tx_history_syncs.ledger(fee_addr)
+    except Exception as e:
+        print(f"Error calculating rewards for network {network}: {e}")
+        mark_fields_stale(network, "rewards")
+        return
+    _rewards_synced[network] = time.monotonic()
+    mark = (today, (ledger.get("checkpoint") or {}).get("hash"), tuple(stake_info.values()))
+    if mark == last:
+        record_fields(network, "rewards")
+        return
+    fee_addr_info = buildFeeAddrInfo(fee_addr, ledger_rewards(ledger), stake_info)
+    try:
+        store = get_timeseries(network)
+        store.sync_rewards(ledger["days"])
+        # Longer windows than the 30 days of rewards published
+        for name, average in timeseries_apy(store, stake_info['stake_value'], stake_info['sovereign_tax'],
+                                            windows=(90, 365)).items():
+            fee_addr_info[name] = {"date": fee_addr_info["ma30"]["date"], **average}
+    except OSError as e:
+        print(f"Error updating time series for {network}: {e}")
+    _rewards_marks[network] = mark
+    record_fields(network, "rewards")
+    with _live_lock:
+        entry['fee_addr_info'] = fee_addr_info
+        _mark_live_dirty()
+
+# Copy of the live data in collectAllData's layout, ready for buildFinalOutput
+def liveCollectedData():
+    with _live_lock:
+        collected_data = copy.deepcopy(live_data)
+    # Networks without stake info are not validators of ours
+    collected_data['networks'] = {
+        network: entry for network, entry in collected_data['networks'].items() if 'stake_value' in entry
+    }
+    collected_data['node_addr'] = currentNodeAddr()
+    return collected_data
+
+# Write output.json and GDB from the live data when it changed
+def publishLiveData():
+    global _live_dirty
+    with _live_lock:
+        if not _live_dirty:
+            return
+        _live_dirty = False
+    publish_snapshot(buildFinalOutput(liveCollectedData()))
+
+scheduler = None
+
+# Seconds until the node has been up for STARTUP_DELAY; a reload into a running node waits no longer
+def startupDelay():
+    try:
+        with open("/proc/uptime") as f:
+            system_uptime = float(f.read().split()[0])
+        # Inside the node our own process is the node
+        with open("/proc/self/stat") as f:
+            data = f.read()
+        start_ticks = int(data[data.rindex(")") + 2:].split()[19])
+        process_uptime = system_uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        process_uptime = 0
+    return max(0.0, STARTUP_DELAY - process_uptime)
+
+def build_scheduler():
+    jobs = Scheduler()
+    base = startupDelay()
+    # Each job starts at its own random point after the startup delay, not all at once
+    first = lambda delay=0: base + delay + random.uniform(0, STARTUP_STAGGER)
+    jobs.add("status", collectStatus, STATUS_INTERVAL, delay=first())
+    jobs.add("stake", collectStake, STAKE_INTERVAL, delay=first())
+    # Rewards and publish first run when the stake job and rewards job trigger them
+    jobs.add("rewards", collectRewards, REWARDS_CHECK_INTERVAL, delay=first(REWARDS_CHECK_INTERVAL))
+    jobs.add("publish", publishLiveData, PUBLISH_INTERVAL, delay=first(PUBLISH_INTERVAL))
+    jobs.add("update", update_plugin_if_needed, UPDATE_INTERVAL, delay=first(UPDATE_FIRST_DELAY))
+    jobs.add("resources", sampleNodeResources, RESOURCE_SAMPLE_INTERVAL, delay=first())
+    jobs.add("config", watchNetworkConfigs, CONFIG_CHECK_INTERVAL, delay=first())
+    if CHAIN_READER_ENABLED:
+        jobs.add("chain", sampleChainStorage, CHAIN_POLL_INTERVAL, delay=first())
+    if AGGREGATOR_ENABLED:
+        jobs.add("aggregate", refresh_hub_index, AGGREGATOR_INTERVAL, delay=first())
+    return jobs
+
 # Write data to GDB
 def write_to_gdb(group_name, key, value):
     try:
-        result = subprocess.run(
-            [CLI, "global_db", "write", "-group", group_name, "-key", key, "-value", str(value)],
-            capture_output=True,
-            text=True
-        )
+        result = run_cli(["global_db", "write", "-group", group_name, "-key", key, "-value", str(value)])
         if result.returncode == 0:
             print(f"Successfully wrote {key}: {value} to {group_name}")
+            return True
         else:
             print(f"Error writing {key}: {value} to {group_name}: {result.stderr}")
     except Exception as e:
         print(f"Error: {str(e)}")
+    return False
 
+# -------------- GDB PUBLISHER ----------------
 
+_gdb_api = None
+_gdb_api_loaded = False
 
-def transform_to_db_structure_and_write():
-    # Read from the output.json file
-    with open("/opt/cellframe-node/var/lib/plugins/hub/output.json", "r") as f:
-        data = json.load(f)
+def get_gdb_api():
+    """Returns the node's in-process GlobalDB binding, or None when running outside the node."""
+    global _gdb_api, _gdb_api_loaded
+    if not _gdb_api_loaded:
+        for module_name in ("DAP.GlobalDB", "CellFrame.Chain"):
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            api = getattr(module, "GlobalDB", None)
+            if api is not None and hasattr(api, "set"):
+                _gdb_api = api
+                break
+        _gdb_api_loaded = True
+    return _gdb_api
 
-    group_name = "hub"  # Group name in the global database
+# Delete a key from GDB
+def delete_from_gdb(group_name, key):
+    try:
+        result = run_cli(["global_db", "delete", "-group", group_name, "-key", key])
+        if result.returncode == 0:
+            print(f"Deleted {key} from {group_name}")
+            return True
+        print(f"Error deleting {key} from {group_name}: {result.stderr}")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+    return False
+
+# Reply of a global_db write or delete that went through; each is a single line
+_GDB_OK_REPLY = re.compile(r"success", re.IGNORECASE)
+
+def _run_gdb_batch_cli(commands, fallback):
+    """Runs {key: command line} through a single cellframe-node-cli process fed with one command per line.
+
+    Each command answers with one line, read back in order to get the result per key. Keys whose reply
+    cannot be told apart (the batch failed or printed an unexpected number of lines) are retried with
+    `fallback(key)`.
+    """
+    if not commands:
+        return {}
+    script = "".join(f"{line}\n" for line in commands.values())
+    replies = None
+    try:
+        result = run_cli([], input=script)
+        replies = [line for line in result.stdout.splitlines() if line.strip()]
+        if len(replies) != len(commands):
+            print(f"Batched GDB command gave {len(replies)} replies for {len(commands)} commands: {result.stderr}")
+            replies = None
+    except Exception as e:
+        print(f"Error: {str(e)}")
+    if replies is None:
+        return {key: fallback(key) for key in commands}
+    results = {}
+    for key, reply in zip(commands, replies):
+        results[key] = bool(_GDB_OK_REPLY.search(reply)) and not cli_reply_failed(reply)
+        if not results[key]:
+            print(f"Batched GDB command for {key} failed: {reply.strip()}")
+    return results
+
+def _write_gdb_batch_cli(group_name, records):
+    results = {}
+    commands = {}
+    for key, value in records.items():
+        value = str(value)
+        # The interactive CLI splits commands on whitespace, such values need their own argv call
+        if not value or any(c.isspace() for c in key + value):
+            results[key] = write_to_gdb(group_name, key, value)
+        else:
+            commands[key] = f"global_db write -group {group_name} -key {key} -value {value}"
+    results.update(_run_gdb_batch_cli(
+        commands, lambda key: write_to_gdb(group_name, key, records[key])))
+    return results
+
+def write_gdb_batch(group_name, records):
+    """Writes all records of a cycle in one operation. Returns {key: success}."""
+    api = get_gdb_api()
+    if api is None:
+        return _write_gdb_batch_cli(group_name, records)
+    results = {}
+    for key, value in records.items():
+        try:
+            results[key] = api.set(key, group_name, str(value).encode()) is not False
+        except Exception as e:
+            print(f"Error writing {key} to {group_name}: {e}")
+            results[key] = False
+    return results
+
+def delete_gdb_batch(group_name, keys):
+    """Deletes keys in one operation. Returns {key: success}."""
+    api = get_gdb_api()
+    if api is None:
+        return _run_gdb_batch_cli(
+            {key: f"global_db delete -group {group_name} -key {key}" for key in keys},
+            lambda key: delete_from_gdb(group_name, key))
+    results = {}
+    for key in keys:
+        try:
+            results[key] = api.delete(key, group_name) is not False
+        except Exception as e:
+            print(f"Error deleting {key} from {group_name}: {e}")
+            results[key] = False
+    return results
+
+# Last values written to GDB, so a cycle only publishes what changed
+GDB_SNAPSHOT_FILE = os.path.join(PLUGIN_PATH, "gdb_snapshot.json")
+# Every key is rewritten at least this often so late joiners converge
+GDB_FULL_REFRESH_INTERVAL = 6 * 3600
+# Dated keys (ma7/ma30/rewards per day) older than this many days are deleted
+GDB_DATED_KEY_RETENTION_DAYS = 2
+# How far back to look for dated keys left behind by versions without expiry
+GDB_LEGACY_SWEEP_DAYS = 30
+_DATED_KEY = re.compile(r'^(.+_fee_addr_info_(?:ma7|ma30|rewards))_(\w{3}_\d{2}_\w{3}_\d{4})$')
+
+def load_gdb_snapshot():
+    try:
+        with open(GDB_SNAPSHOT_FILE, 'r') as f:
+            snapshot = json.load(f)
+        if isinstance(snapshot.get("written"), dict):
+            return snapshot
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Error reading GDB snapshot, doing a full refresh: {e}")
+    return {"written": {}, "full_refresh": 0, "legacy_swept": False}
+
+def save_gdb_snapshot(snapshot):
+    os.makedirs(os.path.dirname(GDB_SNAPSHOT_FILE), exist_ok=True)
+    tmp_path = f"{GDB_SNAPSHOT_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+    os.replace(tmp_path, GDB_SNAPSHOT_FILE)
+
+def _dated_key_day(key):
+    match = _DATED_KEY.match(key)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(2), "%a_%d_%b_%Y").date()
+    except ValueError:
+        return None
+
+def find_expired_gdb_keys(snapshot, records, now=None):
+    """Dated keys that fell out of the retention window."""
+    today = (now or datetime.now()).date()
+    cutoff = today - timedelta(days=GDB_DATED_KEY_RETENTION_DAYS - 1)
+    expired = set()
+    for key in snapshot["written"]:
+        day = _dated_key_day(key)
+        if day is not None and day < cutoff and key not in records:
+            expired.add(key)
+    if not snapshot.get("legacy_swept"):
+        # Older versions never expired anything: sweep the dated keys they may have left behind
+        prefixes = {_DATED_KEY.match(key).group(1) for key in records if _DATED_KEY.match(key)}
+        for days_ago in range(GDB_DATED_KEY_RETENTION_DAYS, GDB_LEGACY_SWEEP_DAYS + 1):
+            suffix = (today - timedelta(days=days_ago)).strftime("%a_%d_%b_%Y")
+            expired.update(f"{prefix}_{suffix}" for prefix in prefixes)
+    return expired
+
+def publish_gdb_records(group_name, records, now=None):
+    """Writes only the records whose value changed since the last publish and expires stale dated keys.
+
+    Returns {key: success} for the keys that were written.
+    """
+    snapshot = load_gdb_snapshot()
+    written = snapshot["written"]
+    current_time = time.time()
+    full_refresh = current_time - snapshot.get("full_refresh", 0) >= GDB_FULL_REFRESH_INTERVAL
+    if full_refresh:
+        changed = dict(records)
+    else:
+        changed = {key: value for key, value in records.items() if written.get(key) != str(value)}
+    results = write_gdb_batch(group_name, changed) if changed else {}
+    for key, ok in results.items():
+        if ok:
+            written[key] = str(records[key])
+            if hub_index is not None and group_name == "hub":
+                hub_index.apply(key, records[key])
+    if full_refresh:
+        snapshot["full_refresh"] = current_time
+
+    expired = find_expired_gdb_keys(snapshot, records, now)
+    if expired:
+        for key, ok in delete_gdb_batch(group_name, sorted(expired)).items():
+            # Failed deletes stay in the snapshot and are retried next cycle
+            if ok:
+                written.pop(key, None)
+                if hub_index is not None and group_name == "hub":
+                    hub_index.remove(key)
+        print(f"Expired {len(expired)} dated keys from {group_name}")
+    snapshot["legacy_swept"] = True
+    save_gdb_snapshot(snapshot)
+    print(f"Published {len(changed)} of {len(records)} keys to {group_name}"
+          f"{' (full refresh)' if full_refresh else ''}")
+    return results
+
+def _date_suffix(date):
+    return date.replace(',', '').replace(' ', '_')
+
+def build_gdb_records(data):
+    """Flattens a snapshot into the `hub` group key space: {key: value}."""
+    records = {}
     node_addr = data['node_addr'].replace("::", "").replace(":", "")  # Format node address
 
-    # Write basic node information to GDB
-    write_to_gdb(group_name, f"{node_addr}_hostname", data['hostname'])
-    write_to_gdb(group_name, f"{node_addr}_service_uptime", data['service_uptime'])
-    write_to_gdb(group_name, f"{node_addr}_node_version", data['node_version'])
-    write_to_gdb(group_name, f"{node_addr}_timestamp", data['timestamp'])
+    # Basic node information
+    records[f"{node_addr}_hostname"] = data['hostname']
+    records[f"{node_addr}_service_uptime"] = data['service_uptime']
+    records[f"{node_addr}_node_version"] = data['node_version']
+    records[f"{node_addr}_timestamp"] = data['timestamp']
+    if data.get('node_resources'):
+        records[f"{node_addr}_node_resources"] = json.dumps(data['node_resources'], separators=(',', ':'))
+    if data.get('collector_metrics'):
+        records[f"{node_addr}_collector_metrics"] = compact_metrics(data['collector_metrics'])
 
-    # Write network-related information to GDB
+    # Network-related information
+    today = datetime.now().strftime("%a, %d %b %Y")
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%a, %d %b %Y")
     for network, info in data['network_info'].items():
-        write_to_gdb(group_name, f"{node_addr}_{network}_our_node_state", info['our_node_state'])
-        write_to_gdb(group_name, f"{node_addr}_{network}_network_state", info['network_state'])
-        write_to_gdb(group_name, f"{node_addr}_{network}_main_status", info['main_status'])
-        write_to_gdb(group_name, f"{node_addr}_{network}_sync_percentage", info['sync_percentage'])
-        write_to_gdb(group_name, f"{node_addr}_{network}_block_height", info['block_height'])
-        write_to_gdb(group_name, f"{node_addr}_{network}_stake_value", info['stake_value'])
-
-        # Write fee_addr_info if present
+        prefix = f"{node_addr}_{network}"
+        records[f"{prefix}_our_node_state"] = info['our_node_state']
+        records[f"{prefix}_network_state"] = info['network_state']
+        records[f"{prefix}_main_status"] = info['main_status']
+        records[f"{prefix}_sync_percentage"] = info['sync_percentage']
+        records[f"{prefix}_block_height"] = info['block_height']
+        records[f"{prefix}_stake_value"] = info['stake_value']
+
         fee_addr_info = info.get('fee_addr_info')
         if fee_addr_info:
-            write_to_gdb(group_name, f"{node_addr}_{network}_fee_addr_info_fee_addr", fee_addr_info['fee_addr'])
-            write_to_gdb(group_name, f"{node_addr}_{network}_fee_addr_info_ma7_{fee_addr_info['ma7']['date'].replace(',', '').replace(' ', '_')}", fee_addr_info['ma7']['value'])
-            write_to_gdb(group_name, f"{node_addr}_{network}_fee_addr_info_ma7_apy", fee_addr_info['ma7']['apy'])
-            write_to_gdb(group_name, f"{node_addr}_{network}_fee_addr_info_ma30_{fee_addr_info['ma30']['date'].replace(',', '').replace(' ', '_')}", fee_addr_info['ma30']['value'])
-            write_to_gdb(group_name, f"{node_addr}_{network}_fee_addr_info_ma30_apy", fee_addr_info['ma30']['apy'])
-
-            # Write only today's and yesterday's rewards
-            rewards = fee_addr_info['rewards']
-            for reward_date, reward_value in rewards.items():
-                # Filter to only today and yesterday's rewards
-                today = datetime.now().strftime("%a, %d %b %Y")
-                yesterday = (datetime.now() - timedelta(days=1)).strftime("%a, %d %b %Y")
-                if reward_date in [today, yesterday]:
-                    reward_key = f"{node_addr}_{network}_fee_addr_info_rewards_{reward_date.replace(',', '').replace(' ', '_')}"
-                    write_to_gdb(group_name, reward_key, reward_value)
-
-        # Write sovereign_addr_info if present
+            records[f"{prefix}_fee_addr_info_fee_addr"] = fee_addr_info['fee_addr']
+            records[f"{prefix}_fee_addr_info_ma7_{_date_suffix(fee_addr_info['ma7']['date'])}"] = fee_addr_info['ma7']['value']
+            records[f"{prefix}_fee_addr_info_ma7_apy"] = fee_addr_info['ma7']['apy']
+            records[f"{prefix}_fee_addr_info_ma30_{_date_suffix(fee_addr_info['ma30']['date'])}"] = fee_addr_info['ma30']['value']
+            records[f"{prefix}_fee_addr_info_ma30_apy"] = fee_addr_info['ma30']['apy']
+
+            # Only today's and yesterday's rewards
+            for reward_date, reward_value in fee_addr_info['rewards'].items():
+                if reward_date in (today, yesterday):
+                    records[f"{prefix}_fee_addr_info_rewards_{_date_suffix(reward_date)}"] = reward_value
+
         sovereign_addr_info = info.get('sovereign_addr_info')
         if sovereign_addr_info:
-            write_to_gdb(group_name, f"{node_addr}_{network}_sovereign_addr_info_sovereign_addr", sovereign_addr_info['sovereign_addr'])
-            write_to_gdb(group_name, f"{node_addr}_{network}_sovereign_addr_info_sovereign_tax", sovereign_addr_info['sovereign_tax'])
+            records[f"{prefix}_sovereign_addr_info_sovereign_addr"] = sovereign_addr_info['sovereign_addr']
+            records[f"{prefix}_sovereign_addr_info_sovereign_tax"] = sovereign_addr_info['sovereign_tax']
         else:
             print(f"No sovereign_addr_info found for network {network}")
+    return records
+
+def transform_to_db_structure_and_write(data=None):
+    # Without a snapshot, republish the last output.json
+    if data is None:
+        with open(OUTPUT_FILE, "r") as f:
+            data = json.load(f)
+
+    group_name = "hub"  # Group name in the global database
+    records = build_gdb_records(data)
+    results = publish_gdb_records(group_name, records)
+    failed = [key for key, ok in results.items() if not ok]
+    if failed:
+        print(f"Failed to write {len(failed)} of {len(results)} keys to GDB: {', '.join(failed)}")
+    else:
+        print(f"Data successfully written to GDB ({len(results)} keys).")
+    return results
+
+
+# -------------- PUBLISH SINKS ----------------
+
+# Every snapshot is built once in memory and handed to each enabled sink concurrently
+SINK_GDB_ENABLED = True  # `hub` group of the GlobalDB
+SINK_FILE_ENABLED = True  # OUTPUT_FILE, compact JSON replaced atomically
+SINK_HTTP_ENABLED = False  # Latest snapshot held in memory and served on HTTP_HOST:HTTP_PORT
+# Minimum seconds between runs of each sink; 0 runs it on every publish.
+# Timestamp, uptime, block height and metrics change on every publish, so GDB, whose writes are
+# replicated to the whole hub, keeps the original 30 minute cadence; file and HTTP follow PUBLISH_INTERVAL.
+SINK_GDB_INTERVAL = 1800
+SINK_FILE_INTERVAL = 0
+SINK_HTTP_INTERVAL = 0
+
+class Sink:
+    """A consumer of published snapshots. fn(snapshot) must not modify the snapshot."""
+
+    def __init__(self, name, fn, enabled=True, interval=0):
+        self.name = name
+        self.fn = fn
+        self.enabled = enabled
+        self.interval = interval
+        self.last_run = None
+        self.last_duration = None
+        self.last_error = None
+
+    def due(self, now):
+        return self.enabled and (self.last_run is None or now - self.last_run >= self.interval)
+
+    def run(self, snapshot):
+        started = time.perf_counter()
+        try:
+            with stage(f"sink.{self.name}"):
+                self.fn(snapshot)
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Sink {self.name} failed: {e}")
+            return False
+        finally:
+            self.last_duration = time.perf_counter() - started
+
+# Latest published snapshot: (snapshot, {path: (body, ETag, content type)}), read by the HTTP endpoint
+latest_snapshot = None
+
+def hold_snapshot(snapshot):
+    global latest_snapshot
+    latest_snapshot = (snapshot, build_http_routes(snapshot))
+
+def build_sinks():
+    return [
+        Sink("gdb", transform_to_db_structure_and_write, SINK_GDB_ENABLED, SINK_GDB_INTERVAL),
+        Sink("file", writeFinalOutput, SINK_FILE_ENABLED, SINK_FILE_INTERVAL),
+        Sink("http", hold_snapshot, SINK_HTTP_ENABLED, SINK_HTTP_INTERVAL),
+    ]
+
+sinks = None
+_sinks_lock = threading.Lock()
+
+def publish_snapshot(snapshot):
+    """Hands snapshot to every due sink in parallel and waits for them; returns {sink name: success}."""
+    global sinks
+    with _sinks_lock:
+        if sinks is None:
+            sinks = build_sinks()
+        now = time.monotonic()
+        due = [sink for sink in sinks if sink.due(now)]
+        for sink in due:
+            sink.last_run = now
+        if not due:
+            return {}
+        if len(due) == 1:
+            return {due[0].name: due[0].run(snapshot)}
+        with ThreadPoolExecutor(max_workers=len(due), thread_name_prefix="hub-sink") as pool:
+            futures = {sink.name: submit_with_budget(pool, sink.run, snapshot) for sink in due}
+            return {name: future.result() for name, future in futures.items()}
+
+# -------------- HTTP ENDPOINT ----------------
+
+# Served while SINK_HTTP_ENABLED; responses come from the last published snapshot, never from the CLI
+HTTP_HOST = "127.0.0.1"
+HTTP_PORT = 9180
+HTTP_READ_TIMEOUT = 10  # Seconds an idle keep-alive connection is kept open
+_JSON_TYPE = "application/json"
+_PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_HTTP_STATUS = {200: "OK", 304: "Not Modified", 404: "Not Found", 405: "Method Not Allowed",
+                503: "Service Unavailable"}
+
+def _route(body, content_type):
+    return body, '"%s"' % hashlib.sha1(body).hexdigest(), content_type
+
+def _prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_prometheus(snapshot):
+    """Prometheus text exposition of the per-network values and collector timings of a snapshot."""
+    families = {}
+
+    def add(name, kind, help_text, labels, value):
+        value = _to_float(value)
+        if value is None:
+            return
+        family = families.setdefault(name, (kind, help_text, []))
+        label_text = ",".join(f'{key}="{_prometheus_label(val)}"' for key, val in labels.items())
+        family[2].append(f"{name}{{{label_text}}} {value!r}" if label_text else f"{name} {value!r}")
+
+    for network, info in sorted(snapshot.get("network_info", {}).items()):
+        labels = {"network": network}
+        add("hub_block_height", "gauge", "Block height of the network.", labels, info.get("block_height"))
+        add("hub_sync_percentage", "gauge", "Sync percentage of the network.", labels, info.get("sync_percentage"))
+        add("hub_stake_value", "gauge", "Stake of our validator.", labels, info.get("stake_value"))
+        stale = set(info.get("stale") or ())
+        for group, updated in (info.get("updated") or {}).items():
+            add("hub_data_updated_timestamp_seconds", "gauge", "Last successful collection of a field group.",
+                {**labels, "group": group}, updated)
+            add("hub_data_stale", "gauge", "1 if the latest collection of a field group failed.",
+                {**labels, "group": group}, int(group in stale))
+        fee_addr_info = info.get("fee_addr_info") or {}
+        for window in ("ma7", "ma30", "ma90", "ma365"):
+            average = fee_addr_info.get(window)
+            if average:
+                add("hub_reward_average", "gauge", "Moving average of daily rewards.",
+                    {**labels, "window": window}, average.get("value"))
+                add("hub_apy", "gauge", "APY of the moving average of rewards.",
+                    {**labels, "window": window}, average.get("apy"))
+    for network, chains in sorted((snapshot.get("local_chains") or {}).items()):
+        for chain, stats in sorted(chains.items()):
+            labels = {"network": network, "chain": chain}
+            add("hub_chain_atoms", "gauge", "Atoms in the local chain files.", labels, stats["atoms"])
+            add("hub_chain_bytes", "gauge", "Bytes of complete atoms in the local chain files.", labels,
+                stats["bytes"])
+            add("hub_chain_atoms_per_second", "gauge", f"Local chain growth over {CHAIN_RATE_WINDOW}s.",
+                labels, stats["atoms_per_s"])
+    if snapshot.get("cli_circuit"):
+        add("hub_cli_circuit_open", "gauge", "1 while the CLI circuit breaker is open.", {},
+            int(snapshot["cli_circuit"] == "open"))
+    for result, count in (snapshot.get("tx_history_syncs") or {}).items():
+        add("hub_tx_history_syncs_total", "counter", "Reward ledger syncs, fetched or coalesced into another.",
+            {"result": result}, count)
+    for name, metric in sorted((snapshot.get("collector_metrics") or {}).items()):
+        labels = {"name": name}
+        add("hub_collector_calls_total", "counter", "Timed CLI calls and stages.", labels, metric["count"])
+        add("hub_collector_errors_total", "counter", "Failed CLI calls and stages.", labels, metric["errors"])
+        for field, quantile in (("p50_s", "0.5"), ("p95_s", "0.95")):
+            add("hub_collector_duration_seconds", "gauge",
+                f"Duration quantiles over the last {METRICS_WINDOW} runs.",
+                {**labels, "quantile": quantile}, metric[field])
+        add("hub_collector_last_duration_seconds", "gauge", "Duration of the last run.", labels, metric["last_s"])
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return ("\n".join(lines) + "\n").encode()
+
+def build_http_routes(snapshot):
+    """{path: (body, ETag, content type)} of every response, rendered once per published snapshot."""
+    routes = {
+        "/snapshot": _route(json.dumps(snapshot, separators=(',', ':')).encode(), _JSON_TYPE),
+        "/metrics": _route(render_prometheus(snapshot), _PROMETHEUS_TYPE),
+    }
+    routes["/"] = routes["/snapshot"]
+    for network, info in snapshot.get("network_info", {}).items():
+        subset = {key: snapshot.get(key) for key in ("node_addr", "hostname", "timestamp")}
+        subset["network_info"] = {network: info}
+        routes[f"/networks/{network}"] = _route(json.dumps(subset, separators=(',', ':')).encode(), _JSON_TYPE)
+    return routes
+
+class HttpEndpoint:
+    """asyncio HTTP/1.1 server on its own thread, answering GET/HEAD from latest_snapshot."""
+
+    def __init__(self, host=None, port=None):
+        self.host = host or HTTP_HOST
+        self.port = HTTP_PORT if port is None else port
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.error = None
+
+    def start(self, wait=True):
+        """Starts serving; with wait, blocks until the port is bound and raises if binding failed."""
+        self.thread = threading.Thread(target=self._serve, name="hub-http", daemon=True)
+        self.thread.start()
+        if wait:
+            self.ready.wait(10)
+            if self.error is not None:
+                raise self.error
+        return self
+
+    def stop(self, timeout=5):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _serve(self):
+        import asyncio
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self.error = e
+            print(f"Could not start the HTTP endpoint on {self.host}:{self.port}: {e}")
+            self.ready.set()
+            self.loop.close()
+            return
+        print(f"HTTP endpoint listening on {self.host}:{self.port}")
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    async def _handle(self, reader, writer):
+        import asyncio
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), HTTP_READ_TIMEOUT)
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), HTTP_READ_TIMEOUT)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    break
+                method, target, version = parts
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                writer.write(self.respond(method, target.split("?", 1)[0], headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def respond(self, method, path, headers, keep_alive=False):
+        """Full response bytes for one request."""
+        extra = ""
+        if method not in ("GET", "HEAD"):
+            status, body, etag, content_type = 405, b"", None, "text/plain"
+            extra = "Allow: GET, HEAD\r\n"
+        elif latest_snapshot is None:
+            status, body, etag, content_type = 503, b"no snapshot published yet\n", None, "text/plain"
+        else:
+            route = latest_snapshot[1].get(path.rstrip("/") or "/")
+            if route is None:
+                status, body, etag, content_type = 404, b"not found\n", None, "text/plain"
+            else:
+                body, etag, content_type = route
+                status = 304 if headers.get("if-none-match") == etag else 200
+        if etag is not None:
+            extra += f"ETag: {etag}\r\nCache-Control: no-cache\r\n"
+        if status == 304 or method == "HEAD":
+            length, body = (0 if status == 304 else len(body)), b""
+        else:
+            length = len(body)
+        head = (f"HTTP/1.1 {status} {_HTTP_STATUS[status]}\r\n"
+                f"Content-Type: {content_type}\r\nContent-Length: {length}\r\n{extra}"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode() + body
+
+http_endpoint = None
+
+def start_http_endpoint(wait=True):
+    global http_endpoint
+    try:
+        http_endpoint = HttpEndpoint().start(wait)
+    except OSError:
+        http_endpoint = None
+
+def stop_http_endpoint():
+    global http_endpoint
+    if http_endpoint is not None:
+        http_endpoint.stop()
+        http_endpoint = None
+
+# -------------- CLI SOCKET CLIENT ----------------
+
+# Unix socket of the node's CLI server ([conserver] listen_unix_socket_path in cellframe-node.cfg)
+CLI_SOCKET = "/opt/cellframe-node/var/run/node_cli"
+CLI_SOCKET_ENABLED = True
+# After a socket failure, commands go through the CLI binary for this long
+CLI_SOCKET_RETRY_INTERVAL = 300
+
+# Replies the CLI server sends instead of a command's result; cellframe-node-cli exits non-zero on them
+_CLI_ERROR_REPLY = re.compile(
+    r"\s*(?:error\b|unknown command|command .* not (?:recognized|found)|can'?t\b|cannot\b|invalid\b|wrong\b)",
+    re.IGNORECASE)
+
+def cli_reply_failed(output):
+    """True when a CLI server reply is an error message rather than the command's output."""
+    if _CLI_ERROR_REPLY.match(output):
+        return True
+    # JSON-RPC style replies carry their failures in an "errors" member
+    if '"errors"' in output and output.lstrip().startswith("{"):
+        try:
+            return bool(json.loads(output).get("errors"))
+        except ValueError:
+            return False
+    return False
+
+class CliSocketError(Exception):
+    """The CLI server closed the connection or answered with something that is not a response."""
+
+class CliConnection:
+    """One keep-alive connection to the node's CLI server.
+
+    Requests use the same framing as cellframe-node-cli: an HTTP POST to /connect whose body is the
+    command and its arguments separated by CRLF and terminated by an empty line.
+    """
+
+    def __init__(self, path, timeout):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.reader = self.sock.makefile('rb')
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def _send(self, args, timeout):
+        """Sends a command and reads the response head. Returns (content_length, keep_alive)."""
+        self.sock.settimeout(timeout)
+        body = ("\r\n".join(args) + "\r\n\r\n").encode()
+        head = ("POST /connect HTTP/1.1\r\nHost: localhost\r\nContent-Type: text/text\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n").encode()
+        self.sock.sendall(head + body)
+        status = self.reader.readline()
+        if not status.startswith(b"HTTP/"):
+            raise CliSocketError(f"unexpected response {status[:40]!r}")
+        length = None
+        keep_alive = True
+        while True:
+            line = self.reader.readline()
+            if not line:
+                raise CliSocketError("connection closed in response headers")
+            if line in (b"\r\n", b"\n"):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection" and value.strip().lower() == "close":
+                keep_alive = False
+        return length, keep_alive and length is not None
+
+    def request(self, args, timeout):
+        """Runs a command. Returns (output, reusable)."""
+        length, keep_alive = self._send(args, timeout)
+        body = self.reader.read(length) if length is not None else self.reader.read()
+        if length is not None and len(body) < length:
+            raise CliSocketError("connection closed in response body")
+        return body.rstrip(b"\0").decode(errors='replace'), keep_alive
+
+    def stream(self, args, timeout):
+        """Runs a command and yields its output line by line as it arrives."""
+        length, _ = self._send(args, timeout)
+        remaining = length
+        while remaining is None or remaining > 0:
+            line = self.reader.readline(remaining if remaining is not None else -1)
+            if not line:
+                if remaining:
+                    raise CliSocketError("connection closed in response body")
+                return
+            if remaining is not None:
+                remaining -= len(line)
+            yield line.rstrip(b"\0").decode(errors='replace')
+
+class CliSocketPool:
+    """Keeps up to `size` idle connections to the CLI server for reuse."""
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def _acquire(self, timeout):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return CliConnection(self.path, timeout), False
+
+    def _release(self, connection, reusable):
+        with self.lock:
+            if reusable and len(self.idle) < self.size:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def request(self, args, timeout=120):
+        while True:
+            connection, reused = self._acquire(timeout)
+            try:
+                output, reusable = connection.request(args, timeout)
+            except (OSError, CliSocketError):
+                connection.close()
+                # The server may have dropped an idle connection since its last use
+                if reused:
+                    continue
+                raise
+            self._release(connection, reusable)
+            return output
+
+    def run(self, args, timeout=120, input=None):
+        """Same contract as subprocess.run with capture_output: returns a CompletedProcess."""
+        import subprocess
+        if args:
+            replies = [self.request(args, timeout)]
+        else:
+            # Interactive batch: one command per input line, all over pooled connections
+            replies = [self.request(line.split(), timeout)
+                       for line in (input or "").splitlines() if line.strip()]
+        replies = [reply if reply.endswith("\n") else reply + "\n" for reply in replies if reply]
+        # The server answers errors like results; report them the way the CLI binary's exit code does
+        errors = [reply for reply in replies if cli_reply_failed(reply)]
+        return subprocess.CompletedProcess([CLI, *args], 1 if errors else 0,
+                                           stdout="".join(replies), stderr="".join(errors))
+
+    def stream(self, args, timeout=None):
+        connection, _ = self._acquire(timeout)
+        finished = False
+        try:
+            yield from connection.stream(args, timeout)
+            finished = True
+        finally:
+            # A partially read response leaves the connection unusable
+            if finished:
+                self._release(connection, True)
+            else:
+                connection.close()
+
+_cli_socket_pool = None
+_cli_socket_disabled_until = 0
+
+def close_cli_socket_pool():
+    global _cli_socket_pool
+    pool, _cli_socket_pool = _cli_socket_pool, None
+    if pool is not None:
+        with pool.lock:
+            idle, pool.idle = pool.idle, []
+        for connection in idle:
+            connection.close()
+
+def get_cli_socket_pool():
+    """Returns the pool for CLI_SOCKET, or None when commands should go through the CLI binary."""
+    global _cli_socket_pool
+    if not CLI_SOCKET_ENABLED or time.monotonic() < _cli_socket_disabled_until:
+        return None
+    if not os.path.exists(CLI_SOCKET):
+        return None
+    pool = _cli_socket_pool
+    if pool is None or pool.path != CLI_SOCKET:
+        pool = _cli_socket_pool = CliSocketPool(CLI_SOCKET, CLI_MAX_CONCURRENCY)
+    return pool
+
+def disable_cli_socket(error):
+    global _cli_socket_disabled_until
+    _cli_socket_disabled_until = time.monotonic() + CLI_SOCKET_RETRY_INTERVAL
+    print(f"CLI socket {CLI_SOCKET} failed ({error}), using {CLI} for {CLI_SOCKET_RETRY_INTERVAL}s")
+
+# -------------- CLI EXECUTOR ----------------
+
+# Seconds a command may run, by its first word; an explicit run_cli timeout overrides it
+CLI_DEADLINES = {"version": 15, "net": 30, "srv_stake": 60, "tx_history": 300, "global_db": 30,
+                 "plugin": 60, "batch": 120}
+CLI_DEFAULT_DEADLINE = 60
+CLI_CYCLE_BUDGET = 600  # Seconds of CLI time per collection cycle or job run
+CLI_RETRIES = 2  # Retries of a command that timed out or could not reach the node
+CLI_RETRY_BACKOFF = 1.0  # Seconds before the first retry, doubled for each further one
+CLI_BREAKER_THRESHOLD = 3  # Consecutive unresponsive calls that open the circuit
+CLI_BREAKER_COOLDOWN = 120  # Seconds the circuit stays open before one probe call is let through
+
+class CliError(Exception):
+    """A CLI call that did not complete."""
+
+class CliTimeout(CliError):
+    """The command exceeded its deadline and was killed."""
+
+class CliUnavailable(CliError):
+    """The call was not attempted: circuit open or cycle budget spent."""
+
+_cli_deadline = contextvars.ContextVar("cli_deadline", default=None)
+
+@contextmanager
+def cli_budget(seconds):
+    """Bounds the CLI calls made inside the block, including nested budgets, to `seconds` in total."""
+    deadline = time.monotonic() + seconds
+    current = _cli_deadline.get()
+    token = _cli_deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _cli_deadline.reset(token)
+
+def submit_with_budget(pool, fn, *args):
+    """pool.submit that keeps the caller's CLI budget in the worker thread."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+def cli_command_words(args):
+    """Leading non-option words of a command, e.g. ["net", "get", "status"]."""
+    words = []
+    for arg in args[:3]:
+        if arg.startswith("-"):
+            break
+        words.append(arg)
+    return words
+
+def cli_timeout(args, timeout=None):
+    """Seconds the command may take: its deadline, cut to what is left of the cycle budget."""
+    if timeout is None:
+        words = cli_command_words(args)
+        timeout = CLI_DEADLINES.get(words[0] if words else "batch", CLI_DEFAULT_DEADLINE)
+    if _shutdown.is_set():
+        raise CliUnavailable("plugin shutting down")
+    deadline = _cli_deadline.get()
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise CliUnavailable("cycle time budget spent")
+        timeout = min(timeout, remaining)
+    return timeout
+
+class CircuitBreaker:
+    """Fails calls fast after `threshold` consecutive unresponsive ones, probing again after `cooldown`."""
+
+    def __init__(self, threshold=None, cooldown=None):
+        self.threshold = threshold or CLI_BREAKER_THRESHOLD
+        self.cooldown = cooldown or CLI_BREAKER_COOLDOWN
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                print("CLI responsive again, closing the circuit")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+                print(f"CLI unresponsive after {self.failures} calls, pausing it for {self.cooldown}s")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+cli_breaker = CircuitBreaker()
+
+def _kill_process_group(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        proc.kill()
+
+def _spawn_cli(args, timeout, input=None):
+    """subprocess.run in its own process group, so a timeout kills the CLI and anything it started."""
+    import subprocess
+    proc = subprocess.Popen([CLI, *args], stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                            start_new_session=True)
+    try:
+        stdout, stderr = proc.communicate(input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_process_group(proc)
+        proc.communicate()
+        raise CliTimeout(f"{' '.join(cli_command_words(args)) or 'batch'} timed out after {timeout:.0f}s")
+    return subprocess.CompletedProcess([CLI, *args], proc.returncode, stdout, stderr)
+
+def _retry_delay(attempt):
+    """Backoff before retry `attempt`, or None when there is no budget left to wait for it."""
+    delay = CLI_RETRY_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.0)
+    deadline = _cli_deadline.get()
+    if deadline is not None and time.monotonic() + delay >= deadline:
+        return None
+    return delay
+
+# -------------- NODE RESOURCES ----------------
 
-    print("Data successfully written to GDB.")
+NODE_PROCESS_NAME = "cellframe-node"
+RESOURCE_SAMPLE_INTERVAL = 15  # Seconds between resource samples
 
+class NodeSampler:
+    """Samples the node process from /proc without scanning every process on each call.
+
+    The PID is looked up once and re-validated by its start time, so a restarted node is
+    picked up. Inside the node (the usual case for a plugin) it is simply our own PID.
+    """
+
+    def __init__(self, proc_root="/proc"):
+        self.proc_root = proc_root
+        self.pid = None
+        self.start_ticks = None
+        self.previous = None  # (monotonic time, cpu ticks, read bytes, write bytes)
+        self.latest = None
+        self.lock = threading.Lock()
+        self.clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def _read(self, *parts):
+        with open(os.path.join(self.proc_root, *parts), 'r') as f:
+            return f.read()
+
+    def _stat(self, pid):
+        """Fields of /proc/<pid>/stat after the command name (field 3 onwards)."""
+        data = self._read(str(pid), "stat")
+        return data[data.rindex(")") + 2:].split()
+
+    def _is_node(self, pid):
+        try:
+            return self._read(str(pid), "comm").strip() == NODE_PROCESS_NAME
+        except OSError:
+            return False
+
+    def _find_pid(self):
+        if self._is_node(os.getpid()):
+            return os.getpid()
+        for entry in os.listdir(self.proc_root):
+            if entry.isdigit() and self._is_node(entry):
+                return int(entry)
+        return None
+
+    def _validate(self):
+        """Returns the stat fields of the node, finding it again if it restarted or vanished."""
+        if self.pid is not None:
+            try:
+                fields = self._stat(self.pid)
+                if int(fields[19]) == self.start_ticks:
+                    return fields
+            except (OSError, ValueError, IndexError):
+                pass
+        self.pid = self._find_pid()
+        self.previous = None
+        if self.pid is None:
+            return None
+        fields = self._stat(self.pid)
+        self.start_ticks = int(fields[19])
+        return fields
+
+    def _boot_time(self):
+        for line in self._read("stat").splitlines():
+            if line.startswith("btime "):
+                return int(line.split()[1])
+        raise ValueError("btime missing from /proc/stat")
+
+    def sample(self):
+        """Takes a sample; returns the summary dict, or None when the node is not running."""
+        with self.lock:
+            fields = self._validate()
+            if fields is None:
+                self.latest = None
+                return None
+            now = time.monotonic()
+            cpu_ticks = int(fields[11]) + int(fields[12])  # utime + stime
+            rss_kb = 0
+            for line in self._read(str(self.pid), "status").splitlines():
+                if line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+                    break
+            read_bytes = write_bytes = 0
+            try:
+                for line in self._read(str(self.pid), "io").splitlines():
+                    name, _, value = line.partition(":")
+                    if name == "read_bytes":
+                        read_bytes = int(value)
+                    elif name == "write_bytes":
+                        write_bytes = int(value)
+            except OSError:
+                pass  # /proc/<pid>/io needs the same user or root
+            try:
+                open_fds = len(os.listdir(os.path.join(self.proc_root, str(self.pid), "fd")))
+            except OSError:
+                open_fds = None
+            summary = {
+                "pid": self.pid,
+                "uptime_s": int(time.time() - self._boot_time() - self.start_ticks / self.clock_ticks),
+                "cpu_percent": None,
+                "rss_mb": round(rss_kb / 1024, 1),
+                "open_fds": open_fds,
+                "threads": int(fields[17]),
+                "read_bps": None,
+                "write_bps": None,
+            }
+            if self.previous is not None:
+                elapsed = now - self.previous[0]
+                if elapsed > 0:
+                    summary["cpu_percent"] = round((cpu_ticks - self.previous[1]) / self.clock_ticks / elapsed * 100, 1)
+                    summary["read_bps"] = int((read_bytes - self.previous[2]) / elapsed)
+                    summary["write_bps"] = int((write_bytes - self.previous[3]) / elapsed)
+            self.previous = (now, cpu_ticks, read_bytes, write_bytes)
+            self.latest = summary
+            return summary
+
+node_sampler = NodeSampler()
+
+# Resource sample of the node for the live data
+def sampleNodeResources():
+    try:
+        summary = node_sampler.sample()
+    except (OSError, ValueError) as e:
+        print(f"Error sampling node resources: {e}")
+        return None
+    with _live_lock:
+        live_data['node_resources'] = summary
+    return summary
+
+# -------------- HUB AGGREGATOR ----------------
+
+AGGREGATOR_ENABLED = False  # Index every node's records of the hub group
+AGGREGATOR_INTERVAL = 600  # Seconds between reloads of the hub group
+HUB_INDEX_FILE = os.path.join(PLUGIN_PATH, "hub_index.json")
+# Layout version of the index snapshot; a snapshot of another version is discarded for a full reload
+HUB_INDEX_VERSION = 1
+# Node-level fields; anything else after the node address is <network>_<field>
+_NODE_FIELDS = frozenset(("hostname", "service_uptime", "node_version", "timestamp", "collector_metrics",
+                          "node_resources"))
+_HUB_KEY = re.compile(
+    r'^([0-9A-Fa-f]{16})_(?:(' + "|".join(sorted(_NODE_FIELDS)) + r')|(.+?)_('
+    r'our_node_state|network_state|main_status|sync_percentage|block_height|stake_value|'
+    r'fee_addr_info_fee_addr|fee_addr_info_ma7_apy|fee_addr_info_ma30_apy|'
+    r'sovereign_addr_info_sovereign_addr|sovereign_addr_info_sovereign_tax|'
+    r'fee_addr_info_(?:ma7|ma30|rewards)_\w{3}_\d{2}_\w{3}_\d{4}))$'
+)
+# Ranked fields and the metric name they are queried by
+_RANKED_FIELDS = {
+    "fee_addr_info_ma30_apy": "ma30_apy",
+    "fee_addr_info_ma7_apy": "ma7_apy",
+    "stake_value": "stake_value",
+}
+
+def parse_hub_key(key):
+    """Splits a hub group key into (node_addr, network, field); network is None for node fields."""
+    match = _HUB_KEY.match(key)
+    if not match:
+        return None
+    node_addr, node_field, network, field = match.groups()
+    if node_field:
+        return node_addr, None, node_field
+    return node_addr, network, field
+
+def _to_float(value):
+    try:
+        return float(str(value).replace('%', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+class HubIndex:
+    """In-memory index of the hub group by node address and network.
+
+    Rankings are kept sorted and stake totals and sync state are updated per applied key,
+    so queries never scan the whole key space. The GDB sink and the aggregate job update it from
+    their own threads, so every public method holds the index lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.records = {}  # raw key -> value, what the snapshot file stores
+        self.nodes = {}  # node -> {"node": {field: value}, "networks": {network: {field: value}}}
+        self.rankings = {}  # (network, metric) -> sorted [(value, node)]
+        self.stake_totals = {}  # network -> total stake_value
+        self.unsynced = {}  # network -> {node}
+        self.scanned = None  # epoch of the last full load of the group, None if there never was one
+
+    def apply(self, key, value):
+        """Applies one changed key; returns False for keys that are not node records."""
+        with self.lock:
+            parsed = parse_hub_key(key)
+            if parsed is None:
+                return False
+            value = str(value)
+            if self.records.get(key) == value:
+                return True
+            self.records[key] = value
+            node_addr, network, field = parsed
+            node = self.nodes.setdefault(node_addr, {"node": {}, "networks": {}})
+            if network is None:
+                node["node"][field] = value
+                return True
+            info = node["networks"].setdefault(network, {})
+            previous = info.get(field)
+            info[field] = value
+            if field in _RANKED_FIELDS:
+                self._rerank(network, _RANKED_FIELDS[field], node_addr, _to_float(previous), _to_float(value))
+            if field == "stake_value":
+                self.stake_totals[network] = (self.stake_totals.get(network, 0.0)
+                                              - (_to_float(previous) or 0.0) + (_to_float(value) or 0.0))
+            elif field in ("main_status", "sync_percentage", "our_node_state"):
+                self._update_sync(network, node_addr, info)
+            return True
+
+    def remove(self, key):
+        with self.lock:
+            parsed = parse_hub_key(key)
+            if parsed is None or key not in self.records:
+                return
+            del self.records[key]
+            node_addr, network, field = parsed
+            node = self.nodes.get(node_addr)
+            if node is None:
+                return
+            if network is None:
+                node["node"].pop(field, None)
+            else:
+                info = node["networks"].get(network, {})
+                previous = info.pop(field, None)
+                if field in _RANKED_FIELDS:
+                    self._rerank(network, _RANKED_FIELDS[field], node_addr, _to_float(previous), None)
+                if field == "stake_value":
+                    self.stake_totals[network] = (self.stake_totals.get(network, 0.0)
+                                                  - (_to_float(previous) or 0.0))
+                    if (network, "stake_value") not in self.rankings:
+                        del self.stake_totals[network]  # Rather than a float residue of the sum
+                if not info:
+                    node["networks"].pop(network, None)
+                    self.unsynced.get(network, set()).discard(node_addr)
+                elif field in ("main_status", "sync_percentage", "our_node_state"):
+                    self._update_sync(network, node_addr, info)
+            # A node whose last key went away leaves the index
+            if not node["node"] and not node["networks"]:
+                del self.nodes[node_addr]
+
+    def replace_all(self, records):
+        """Brings the index in line with a full load of the group, applying only the differences.
+
+        Returns the number of keys changed or removed.
+        """
+        with self.lock:
+            removed = [key for key in self.records if key not in records]
+            changed = {key: value for key, value in records.items() if self.records.get(key) != str(value)}
+            for key in removed:
+                self.remove(key)
+            for key, value in changed.items():
+                self.apply(key, value)
+            self.scanned = time.time()
+            return len(removed) + len(changed)
+
+    def _rerank(self, network, metric, node_addr, previous, value):
+        ranking = self.rankings.setdefault((network, metric), [])
+        if previous is not None:
+            i = bisect.bisect_left(ranking, (previous, node_addr))
+            if i < len(ranking) and ranking[i] == (previous, node_addr):
+                del ranking[i]
+        if value is not None:
+            bisect.insort(ranking, (value, node_addr))
+        elif not ranking:
+            del self.rankings[(network, metric)]
+
+    def _update_sync(self, network, node_addr, info):
+        percent = _to_float(info.get("sync_percentage"))
+        synced = (info.get("main_status", "synced") == "synced"
+                  and (percent is None or percent >= 100)
+                  and info.get("our_node_state", "NET_STATE_ONLINE") == "NET_STATE_ONLINE")
+        unsynced = self.unsynced.setdefault(network, set())
+        if synced:
+            unsynced.discard(node_addr)
+        else:
+            unsynced.add(node_addr)
+
+    def top(self, metric, k=10, network=None):
+        """Top-k (node_addr, network, value) by a ranked metric (ma30_apy, ma7_apy, stake_value)."""
+        with self.lock:
+            if network is not None:
+                ranking = self.rankings.get((network, metric), [])
+                return [(node_addr, network, value) for value, node_addr in reversed(ranking[-k:])]
+            candidates = []
+            for (net, name), ranking in self.rankings.items():
+                if name == metric:
+                    candidates.extend((value, node_addr, net) for value, node_addr in ranking[-k:])
+            return [(node_addr, net, value) for value, node_addr, net in heapq.nlargest(k, candidates)]
+
+    def out_of_sync(self, network=None):
+        """{network: sorted node addresses} of nodes that are not fully synced."""
+        with self.lock:
+            if network is not None:
+                return {network: sorted(self.unsynced.get(network, ()))}
+            return {net: sorted(nodes) for net, nodes in self.unsynced.items() if nodes}
+
+    def node(self, node_addr):
+        with self.lock:
+            return copy.deepcopy(self.nodes.get(node_addr))
+
+    def save(self, path):
+        with self.lock:
+            snapshot = {"version": HUB_INDEX_VERSION, "scanned": self.scanned, "records": dict(self.records)}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Index from a snapshot; empty, with scanned None, if it is missing or of another version."""
+        index = cls()
+        try:
+            with open(path, 'r') as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") != HUB_INDEX_VERSION:
+                print(f"Hub index snapshot {path} is of another version, reloading the group")
+                return index
+            records = snapshot.get("records", {})
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Error reading hub index snapshot {path}: {e}")
+            return index
+        for key, value in records.items():
+            index.apply(key, value)
+        index.scanned = snapshot.get("scanned")
+        return index
+
+def _decode_gdb_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).rstrip(b"\0").decode(errors='replace')
+    return str(value).strip()
+
+def load_gdb_group(group_name):
+    """Reads every record of a GDB group through the in-process API. Returns {key: value}.
+
+    The CLI has no call that dumps a group with its values, and reading it key by key costs one
+    command per record, so outside the node nothing is loaded; the index then only follows what
+    this node publishes.
+    """
+    api = get_gdb_api()
+    if api is None or not hasattr(api, "grLoad"):
+        print(f"GDB group {group_name} cannot be loaded without the node's GlobalDB API")
+        return {}
+    records = {}
+    for item in api.grLoad(group_name) or []:
+        key = getattr(item, "key", None)
+        if key is not None:
+            records[key] = _decode_gdb_value(getattr(item, "value", ""))
+    return records
+
+hub_index = None
+
+def refresh_hub_index():
+    """Reloads the hub group into the index, applying only changed keys, and snapshots it for the next start.
+
+    Right after a restart a recent snapshot of the same version stands in for the reload.
+    """
+    global hub_index
+    if hub_index is None:
+        hub_index = HubIndex.load(HUB_INDEX_FILE)
+        # A snapshot from the last AGGREGATOR_INTERVAL is as good as a reload: restarts skip the rescan
+        if hub_index.scanned is not None and time.time() - hub_index.scanned < AGGREGATOR_INTERVAL:
+            with hub_index.lock:
+                print(f"Hub index: {len(hub_index.nodes)} nodes, {len(hub_index.records)} records from snapshot")
+            return hub_index
+    records = load_gdb_group("hub")
+    changed = 0
+    if records:
+        changed = hub_index.replace_all(records)
+        hub_index.save(HUB_INDEX_FILE)
+    with hub_index.lock:
+        print(f"Hub index: {len(hub_index.nodes)} nodes, {len(hub_index.records)} records, {changed} changed")
+    return hub_index
+
+# -------------- METRICS ----------------
+
+METRICS_ENABLED = True
+# Upper bounds in seconds of the duration histogram buckets; the last bucket is open-ended
+METRICS_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120)
+# Number of most recent samples the rolling statistics cover
+METRICS_WINDOW = 100
+
+class Metric:
+    """Rolling duration statistics of one CLI command or main_task stage."""
+    __slots__ = ("count", "errors", "retries", "bytes", "last", "samples", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.last = 0.0
+        self.samples = deque()
+        self.histogram = [0] * (len(METRICS_BUCKETS) + 1)
+
+    def add(self, duration, ok=True, output_bytes=0, retries=0):
+        self.count += 1
+        self.errors += not ok
+        self.retries += retries
+        self.bytes += output_bytes
+        self.last = duration
+        self.samples.append(duration)
+        self.histogram[bisect.bisect_left(METRICS_BUCKETS, duration)] += 1
+        if len(self.samples) > METRICS_WINDOW:
+            evicted = self.samples.popleft()
+            self.histogram[bisect.bisect_left(METRICS_BUCKETS, evicted)] -= 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "last_s": round(self.last, 4),
+            "p50_s": round(ordered[len(ordered) // 2], 4) if ordered else 0,
+            "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4) if ordered else 0,
+            "max_s": round(ordered[-1], 4) if ordered else 0,
+            "histogram": list(self.histogram),
+        }
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def record_metric(name, duration, ok=True, output_bytes=0, retries=0):
+    if not METRICS_ENABLED:
+        return
+    with _metrics_lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = Metric()
+        metric.add(duration, ok, output_bytes, retries)
+
+def record_cli(args, duration, returncode, output_bytes, retries=0):
+    """Records one CLI invocation under `cli.<command>`, e.g. cli.net_get_status or cli.tx_history."""
+    if not METRICS_ENABLED:
+        return
+    words = cli_command_words(args)
+    name = "cli." + ("_".join(words) if words else "batch")
+    record_metric(name, duration, returncode == 0, output_bytes, retries)
+
+@contextmanager
+def stage(name):
+    """Times a block as `stage.<name>`; a raised exception counts as an error."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record_metric(f"stage.{name}", time.perf_counter() - started, ok)
+
+def metrics_snapshot():
+    """Summaries of every metric, published with the node data."""
+    with _metrics_lock:
+        return {name: metric.summary() for name, metric in sorted(_metrics.items())}
+
+def compact_metrics(snapshot):
+    """Short form for the hub GDB group: {name: [count, errors, last_s, p95_s]}."""
+    return json.dumps(
+        {name: [m["count"], m["errors"], m["last_s"], m["p95_s"]] for name, m in snapshot.items()},
+        separators=(',', ':'))
+
+# -------------- SCHEDULER ----------------
+
+# Random delay added to every run, as a fraction of the job interval
+JOB_JITTER = 0.05
+
+class Job:
+    __slots__ = ("name", "fn", "interval", "due", "next_run", "running", "triggered")
+
+    def __init__(self, name, fn, interval, delay):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.due = time.monotonic() + delay
+        self.next_run = self.due
+        self.running = False
+        self.triggered = False
+
+class Scheduler:
+    """Runs jobs at independent intervals on a small worker pool.
+
+    A job never overlaps itself: a tick that comes while it is still running is skipped, and
+    missed ticks are not caught up. How late each run starts is recorded as `drift.<job>`.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.pool = None
+
+    def add(self, name, fn, interval, delay=0):
+        self.jobs[name] = Job(name, fn, interval, delay)
+
+    def trigger(self, name):
+        """Runs a job as soon as possible, or right after its current run."""
+        with self.lock:
+            job = self.jobs[name]
+            job.triggered = True
+            job.next_run = min(job.next_run, time.monotonic())
+        self.wakeup.set()
+
+    def start(self):
+        self.pool = ThreadPoolExecutor(max_workers=len(self.jobs), thread_name_prefix="hub-job")
+        self.thread = threading.Thread(target=self._loop, name="hub-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=10):
+        """Stops scheduling and waits up to `timeout` seconds for running jobs to return."""
+        deadline = time.monotonic() + timeout
+        self.stopping.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            while time.monotonic() < deadline:
+                with self.lock:
+                    running = [job.name for job in self.jobs.values() if job.running]
+                if not running:
+                    break
+                self.wakeup.wait(0.05)
+                self.wakeup.clear()
+            else:
+                print(f"Jobs still running at shutdown: {', '.join(running)}")
+
+    def _schedule_next(self, job, now):
+        # Skip missed ticks: the next slot is the first one in the future
+        if job.due <= now:
+            job.due += (int((now - job.due) // job.interval) + 1) * job.interval
+        job.next_run = job.due + random.uniform(0, job.interval * JOB_JITTER)
+
+    def _loop(self):
+        while not self.stopping.is_set():
+            now = time.monotonic()
+            with self.lock:
+                for job in self.jobs.values():
+                    if job.running or job.next_run > now:
+                        continue
+                    record_metric(f"drift.{job.name}", now - job.next_run)
+                    job.running = True
+                    job.triggered = False
+                    self._schedule_next(job, now)
+                    self.pool.submit(self._run, job)
+                for job in self.jobs.values():
+                    # A tick missed while running is dropped, unless the job was triggered
+                    if job.running and job.next_run <= now and not job.triggered:
+                        self._schedule_next(job, now)
+                waiting = [job.next_run for job in self.jobs.values() if not job.running]
+            timeout = min(waiting) - time.monotonic() if waiting else None
+            self.wakeup.wait(max(0, timeout) if timeout is not None else None)
+            self.wakeup.clear()
+
+    def _run(self, job):
+        try:
+            with stage(f"job.{job.name}"), cli_budget(min(CLI_CYCLE_BUDGET, job.interval)):
+                job.fn()
+        except Exception as e:
+            print(f"Job {job.name} failed: {e}")
+        finally:
+            with self.lock:
+                job.running = False
+            self.wakeup.set()
 
 # -------------- UPDATER FUNCTIONS ----------------
 
+UPDATE_HTTP_TIMEOUT = (10, 60)  # Connect and read timeouts of the updater's requests, in seconds
+UPDATE_STATE_FILE = os.path.join(PLUGIN_PATH, "update_state.json")  # ETag of the last handled manifest
+UPDATE_CHUNK_SIZE = 64 * 1024
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Returns the updater's shared requests session, keeping its connection alive between checks."""
+    global _http_session
+    import requests  # Imported on the first update check, not at plugin load
+    import requests.adapters
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+def version_key(version):
+    """Turns a version string into a tuple of ints, so that "1.15" sorts after "1.9"."""
+    return tuple(int(part) for part in re.findall(r'\d+', str(version or "")))
+
+def is_newer_version(remote_version, local_version):
+    """True if remote_version is semantically greater than local_version."""
+    if not remote_version:
+        return False
+    if local_version is None:
+        return True
+    return version_key(remote_version) > version_key(local_version)
+
 def get_version_from_manifest(manifest_path):
     """Reads the version from a local manifest file."""
     try:
@@ -483,36 +3019,104 @@ def get_version_from_manifest(manifest_path):
         print(f"Error parsing manifest file: {manifest_path}")
         return None
 
-def fetch_remote_manifest():
-    """Fetches the manifest.json file from the remote GitHub URL."""
+def load_update_state():
+    """Reads the ETag the remote manifest had when it was last handled."""
+    try:
+        with open(UPDATE_STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_update_state(state):
+    tmp_path = UPDATE_STATE_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, UPDATE_STATE_FILE)
+
+def fetch_remote_manifest(etag=None):
+    """Fetches the remote manifest.json, conditionally on etag.
+
+    Returns (manifest, raw bytes, etag); manifest is None when the manifest is
+    unchanged since etag or could not be fetched.
+    """
+    import requests
+    headers = {"If-None-Match": etag} if etag else {}
     try:
-        response = requests.get(REMOTE_MANIFEST_URL)
+        response = get_http_session().get(REMOTE_MANIFEST_URL, headers=headers, timeout=UPDATE_HTTP_TIMEOUT)
+        if response.status_code == 304:
+            return None, None, etag
         if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Failed to fetch remote manifest: {response.status_code}")
-            return None
-    except requests.RequestException as e:
+            return response.json(), response.content, response.headers.get("ETag")
+        print(f"Failed to fetch remote manifest: {response.status_code}")
+        return None, None, None
+    except (requests.RequestException, ValueError) as e:
         print(f"Error fetching remote manifest: {e}")
-        return None
+        return None, None, None
+
+def download_file(url, path, sha256=None):
+    """Streams url into a temp file next to path and moves it into place once complete.
 
-def download_file(url, path):
-    """Downloads a file from a given URL and saves it to the specified path."""
+    When sha256 is given the download is discarded unless its digest matches.
+    Returns True if path was replaced.
+    """
+    import requests
+    tmp_path = f"{path}.download"
+    digest = hashlib.sha256()
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(path, 'wb') as f:
-                f.write(response.content)
-            print(f"Successfully downloaded {url} to {path}")
-        else:
-            print(f"Failed to download {url}: {response.status_code}")
-    except requests.RequestException as e:
+        with get_http_session().get(url, stream=True, timeout=UPDATE_HTTP_TIMEOUT) as response:
+            if response.status_code != 200:
+                print(f"Failed to download {url}: {response.status_code}")
+                return False
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(UPDATE_CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+        if sha256 is not None and digest.hexdigest() != sha256.lower():
+            print(f"Checksum mismatch for {url}: expected {sha256}, got {digest.hexdigest()}")
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        print(f"Successfully downloaded {url} to {path}")
+        return True
+    except (requests.RequestException, OSError) as e:
         print(f"Error downloading file {url}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+def write_file_atomic(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPDATE_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def update_manifest_checksums(manifest_path):
+    """Records the sha256 of every plugin file next to manifest_path; run before publishing a release."""
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    plugin_dir = os.path.dirname(os.path.abspath(manifest_path))
+    files = manifest.get("files") or {"hub.py": None}
+    manifest["files"] = {name: file_sha256(os.path.join(plugin_dir, name)) for name in files}
+    write_file_atomic(manifest_path, (json.dumps(manifest, indent=3) + "\n").encode())
+    return manifest["files"]
 
 def reload_plugin():
     """Reloads the plugin without restarting the node."""
     try:
-        result = subprocess.run([CLI, "plugin", "reload"], capture_output=True, text=True, timeout=120)
+        result = run_cli(["plugin", "reload"])
         if result.returncode == 0:
             print("Plugin reloaded successfully.")
         else:
@@ -521,38 +3125,63 @@ def reload_plugin():
         print(f"Error: {str(e)}")
 
 def update_plugin_if_needed():
-    """Checks if an update is needed and downloads the latest version if available."""
-    local_version = get_version_from_manifest(LOCAL_MANIFEST)
-    remote_manifest = fetch_remote_manifest()
-
-    if remote_manifest:
-        remote_version = remote_manifest.get("version")
-        if local_version is None or (remote_version and remote_version > local_version):
-            print(f"Updating plugin from version {local_version} to {remote_version}...")
-            download_file(REMOTE_HUB_URL, os.path.join(PLUGIN_PATH, "hub.py"))
-            download_file(REMOTE_MANIFEST_URL, os.path.join(PLUGIN_PATH, "manifest.json"))
-            print("Update completed! Reloading plugin...")
-            reload_plugin()  # Reload the plugin instead of restarting the node
+    """Checks if an update is needed and downloads the latest version if available.
+
+    Returns True if the plugin was updated and reloaded.
+    """
+    state = load_update_state()
+    remote_manifest, raw_manifest, etag = fetch_remote_manifest(state.get("etag"))
+    if remote_manifest is None:
+        if etag is not None:
+            print("Remote manifest unchanged since the last check.")
         else:
-            print(f"Plugin is already up-to-date (version {local_version}).")
-    else:
-        print("Could not fetch remote manifest. Update aborted.")
+            print("Could not fetch remote manifest. Update aborted.")
+        return False
+
+    local_version = get_version_from_manifest(LOCAL_MANIFEST)
+    remote_version = remote_manifest.get("version")
+    if not is_newer_version(remote_version, local_version):
+        print(f"Plugin is already up-to-date (version {local_version}).")
+        save_update_state({"etag": etag, "version": remote_version})
+        return False
+
+    checksum = (remote_manifest.get("files") or {}).get("hub.py")
+    if not checksum:
+        print(f"Remote manifest {remote_version} lists no checksum for hub.py. Update aborted.")
+        return False
+    print(f"Updating plugin from version {local_version} to {remote_version}...")
+    if not download_file(REMOTE_HUB_URL, os.path.join(PLUGIN_PATH, "hub.py"), sha256=checksum):
+        print("Update aborted.")
+        return False  # ETag not saved, so the next check retries
+    write_file_atomic(LOCAL_MANIFEST, raw_manifest)
+    save_update_state({"etag": etag, "version": remote_version})
+    print("Update completed! Reloading plugin...")
+    reload_plugin()  # Reload the plugin instead of restarting the node
+    return True
 # -------------- ORIGINAL FUNCTIONALITY ----------------
 
-# Main function that runs the required tasks every 30 minutes
+# Full collection and publish in one go, outside the scheduler; updates run on their own job
 def main_task():
     print("Running main task...")
-    update_plugin_if_needed()  # Check for updates
-    # Generate the output file
-    generateFinalOutput()
-    # Write to GDB
-    transform_to_db_structure_and_write()
+    with stage("main_task"), cli_budget(CLI_CYCLE_BUDGET):
+        # Collect and publish to output.json, GDB and the other enabled sinks
+        generateFinalOutput()
     print("Task completed. Waiting for the next run...")
-# Run the task every 30 minutes
-def run_periodically(interval_in_minutes=30):
-    interval_in_seconds = interval_in_minutes * 60
-    while True:
-        main_task()
-        time.sleep(interval_in_seconds)
 if __name__ == "__main__":
-    run_periodically(30)  # Run the task every 30 minutes
+    if len(sys.argv) == 4 and sys.argv[1] == "ledger" and sys.argv[2] in ("rebuild", "verify"):
+        # python3 hub.py ledger rebuild|verify <fee_addr>
+        if sys.argv[2] == "rebuild":
+            rebuild_reward_ledger(sys.argv[3])
+        else:
+            sys.exit(1 if verify_reward_ledger(sys.argv[3]) else 0)
+    elif len(sys.argv) == 2 and sys.argv[1] == "checksums":
+        # python3 hub.py checksums: refresh the file hashes of manifest.json before a release
+        plugin_dir = os.path.dirname(os.path.abspath(__file__))
+        print(update_manifest_checksums(os.path.join(plugin_dir, "manifest.json")))
+    else:
+        init()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            deinit()